@@ -1,14 +1,43 @@
 import datetime
 
-from flask import Blueprint, render_template, Response, request, send_from_directory
+from flask import (
+    Blueprint,
+    make_response,
+    render_template,
+    Response,
+    request,
+    send_from_directory,
+    stream_with_context,
+    url_for,
+)
 from flask_login import current_user, login_required
 from loguru import logger
 
-from services import booking_service
+from app import db
+from middleware.http_cache import (
+    get_etag,
+    is_not_modified,
+    make_not_modified_response,
+    set_validators,
+)
+from services import (
+    booking_event_service,
+    booking_fragment_service,
+    booking_series_service,
+    booking_service,
+    workload_service,
+)
+from services.auth_service import admin_user_required
 
 max_bookings = 50
 
+# How often open booking boards poll for new events.
+booking_stream_retry_milliseconds = 5000
+
 bookings_bp = Blueprint("bookings_bp", __name__)
+bookings_bp.add_app_template_global(
+    booking_fragment_service.render_booking_row, "render_booking_row"
+)
 
 
 @bookings_bp.route("/base", methods=["GET"])
@@ -17,19 +46,66 @@ def get_bookings_base():
     return render_template("bookings/bookings_base.html")
 
 
+def get_next_page_url(endpoint: str, data: dict, bookings: list):
+    next_cursor = booking_service.get_next_booking_cursor(bookings, max_bookings)
+    if next_cursor:
+        return url_for(endpoint, **(data | {"cursor": next_cursor}))
+    return
+
+
+def get_bookings_etag(endpoint: str, data: dict) -> str:
+    # Past/future windows move with the date and rows render per user.
+    version = booking_service.get_bookings_version(**data)
+    return get_etag(
+        endpoint,
+        sorted(data.items()),
+        version,
+        current_user.user_id,
+        current_user.is_admin,
+        datetime.datetime.now().date(),
+    )
+
+
+def render_bookings(endpoint: str, data: dict, bookings: list):
+    # Follow-up pages are appended to the existing table body.
+    next_page_url = get_next_page_url(endpoint, data, bookings)
+    if data.get("cursor"):
+        template = "bookings/bookings_page.html"
+    else:
+        template = "bookings/bookings.html"
+    return render_template(template, bookings=bookings, next_page_url=next_page_url)
+
+
+def render_bookings_conditionally(endpoint: str, data: dict, get_bookings):
+    # Skip the list query and rendering when the client copy is current.
+    etag = get_bookings_etag(endpoint, data)
+    if is_not_modified(etag):
+        return make_not_modified_response(etag)
+    try:
+        bookings = get_bookings()
+    except ValueError as e:
+        # The next-page trigger would otherwise append the first page again.
+        logger.error(f"Invalid booking cursor {data.get('cursor') = }: {e}")
+        return "Expected a cursor from the previous page", 400
+    logger.debug(f"{bookings = }")
+    response = make_response(render_bookings(endpoint, data, bookings))
+    return set_validators(response, etag)
+
+
 @bookings_bp.route("/info", methods=["GET"])
 @login_required
 def get_bookings_info():
-    user_id = None
+    data = {}
     if not current_user.is_admin:
-        user_id = current_user.user_id
-    bookings = booking_service.get_bookings(user_id=user_id)
-    bookings = bookings[:max_bookings]
+        data = {"user_id": current_user.user_id}
+    bookings = booking_service.get_bookings(**data, limit=max_bookings)
+    next_page_url = get_next_page_url("bookings_bp.get_bookings", data, bookings)
     booking_filter_form = booking_service.get_booking_filter_form()
     logger.debug(f"{bookings = }")
     return render_template(
         "bookings/bookings_info.html",
         bookings=bookings,
+        next_page_url=next_page_url,
         booking_filter_form=booking_filter_form,
     )
 
@@ -38,16 +114,17 @@ def get_bookings_info():
 @bookings_bp.route("/info/past", methods=["GET"])
 @login_required
 def get_bookings_info_past():
-    user_id = None
+    data = {}
     if not current_user.is_admin:
-        user_id = current_user.user_id
-    bookings = booking_service.get_bookings(user_id=user_id)
-    bookings = bookings[:max_bookings]
+        data = {"user_id": current_user.user_id}
+    bookings = booking_service.get_bookings(**data, limit=max_bookings)
+    next_page_url = get_next_page_url("bookings_bp.get_bookings", data, bookings)
     booking_filter_form = booking_service.get_booking_filter_form()
     logger.debug(f"{bookings = }")
     return render_template(
         "bookings/bookings_info_past.html",
         bookings=bookings,
+        next_page_url=next_page_url,
         booking_filter_form=booking_filter_form,
     )
 
@@ -58,25 +135,29 @@ def get_past_bookings():
     data = request.args.to_dict(flat=True)
     if not current_user.is_admin:
         data = data | {"user_id": current_user.user_id}
+    data.pop("limit", None)
     logger.debug(f"{data = }")
-    bookings = booking_service.get_past_bookings(**data)
-    bookings = bookings[:max_bookings]
-    logger.debug(f"{bookings = }")
-    return render_template("bookings/bookings.html", bookings=bookings)
+    return render_bookings_conditionally(
+        "bookings_bp.get_past_bookings",
+        data,
+        lambda: booking_service.get_past_bookings(**data, limit=max_bookings),
+    )
 
 
 @bookings_bp.route("/info/future", methods=["GET"])
 @login_required
 def get_bookings_info_future():
-    user_id = None
+    data = {}
     if not current_user.is_admin:
-        user_id = current_user.user_id
-    bookings = booking_service.get_future_bookings(user_id=user_id)
+        data = {"user_id": current_user.user_id}
+    bookings = booking_service.get_future_bookings(**data, limit=max_bookings)
+    next_page_url = get_next_page_url("bookings_bp.get_future_bookings", data, bookings)
     booking_filter_form = booking_service.get_booking_filter_form()
     logger.debug(f"{bookings = }")
     return render_template(
         "bookings/bookings_info_future.html",
         bookings=bookings,
+        next_page_url=next_page_url,
         booking_filter_form=booking_filter_form,
     )
 
@@ -87,22 +168,191 @@ def get_future_bookings():
     data = request.args.to_dict(flat=True)
     if not current_user.is_admin:
         data = data | {"user_id": current_user.user_id}
+    data.pop("limit", None)
     logger.debug(f"{data = }")
-    bookings = booking_service.get_future_bookings(**data)
-    bookings = bookings[:max_bookings]
-    logger.debug(f"{bookings = }")
+    return render_bookings_conditionally(
+        "bookings_bp.get_future_bookings",
+        data,
+        lambda: booking_service.get_future_bookings(**data, limit=max_bookings),
+    )
+
+
+@bookings_bp.route("/", methods=["GET"])
+@login_required
+def get_bookings():
+    data = request.args.to_dict(flat=True)
+    if not current_user.is_admin:
+        data = data | {"user_id": current_user.user_id}
+    logger.debug(f"{data = }")
+    return render_bookings_conditionally(
+        "bookings_bp.get_bookings",
+        data,
+        lambda: booking_service.get_bookings(
+            user_id=data.get("user_id"),
+            customer_id=data.get("customer_id"),
+            cursor=data.get("cursor"),
+            limit=max_bookings,
+        ),
+    )
+
+
+@bookings_bp.route("/export.csv", methods=["GET"])
+@login_required
+def export_bookings():
+    data = request.args.to_dict(flat=True)
+    if not current_user.is_admin:
+        data = data | {"user_id": current_user.user_id}
+    logger.debug(f"{data = }")
+    bookings_csv = booking_service.get_bookings_csv(**data)
+    filename = f"Bookings ({datetime.datetime.now()}).csv"
+    return Response(
+        stream_with_context(bookings_csv),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+@bookings_bp.route("/calendar", methods=["GET"])
+@login_required
+def get_bookings_calendar():
+    user_id = None
+    if not current_user.is_admin:
+        user_id = current_user.user_id
+    month = request.args.get("month")
+    logger.debug(f"{month = }")
+    try:
+        booking_calendar = booking_service.get_booking_calendar(month, user_id=user_id)
+    except ValueError as e:
+        logger.error(f"Invalid calendar {month = }: {e}")
+        return "Expected a month as yyyy-mm", 400
+    return render_template(
+        "bookings/bookings_calendar.html", booking_calendar=booking_calendar
+    )
+
+
+@bookings_bp.route("/calendar/<string:date>", methods=["GET"])
+@login_required
+def get_bookings_calendar_day(date: str):
+    user_id = None
+    if not current_user.is_admin:
+        user_id = current_user.user_id
+    logger.debug(f"{date = }")
+    try:
+        date_min = datetime.datetime.strptime(date, "%Y-%m-%d").date()
+    except ValueError as e:
+        logger.error(f"Invalid calendar {date = }: {e}")
+        return "Expected a date as yyyy-mm-dd", 400
+    bookings = booking_service.get_bookings(
+        user_id=user_id,
+        date_min=date_min,
+        date_max=date_min + datetime.timedelta(days=1),
+        descending=False,
+    )
     return render_template("bookings/bookings.html", bookings=bookings)
 
 
-# @bookings_bp.route("/", methods=["GET"])
-# @login_required
-# def get_bookings():
-#     data = request.args.to_dict(flat=True)
-#     logger.debug(f"{data = }")
-#     bookings = booking_service.get_bookings(**data)
-#     bookings = bookings[:50]
-#     logger.debug(f"{bookings = }")
-#     return render_template("bookings/bookings.html", bookings=bookings)
+@bookings_bp.route("/workload", methods=["GET"])
+@login_required
+def get_bookings_workload():
+    user_id = None
+    if not current_user.is_admin:
+        user_id = current_user.user_id
+    today = datetime.datetime.now().date()
+    date_min = request.args.get("date_min") or f"{today - datetime.timedelta(weeks=8)}"
+    date_max = request.args.get("date_max") or f"{today}"
+    logger.debug(f"{date_min = } {date_max = }")
+    try:
+        week_min = datetime.datetime.strptime(date_min, "%Y-%m-%d").date()
+        week_max = datetime.datetime.strptime(date_max, "%Y-%m-%d").date()
+    except ValueError as e:
+        logger.error(f"Invalid workload dates {date_min = } {date_max = }: {e}")
+        return "Expected date_min and date_max as yyyy-mm-dd", 400
+    workload = workload_service.get_workload(week_min, week_max, user_id=user_id)
+    return render_template(
+        "bookings/bookings_workload.html",
+        workload=workload,
+        date_min=date_min,
+        date_max=date_max,
+    )
+
+
+@bookings_bp.route("/stream", methods=["GET"])
+@login_required
+def stream_bookings():
+    # This is short polling over EventSource, not a held-open push stream:
+    # each request sends the booking_event rows committed (on any instance)
+    # since Last-Event-ID and closes, and EventSource polls again after
+    # `retry`. A held stream would tie up a serverless function per board.
+    booking_event_service.prune_booking_events()
+    last_event_id = request.headers.get("Last-Event-ID", type=int)
+    if last_event_id is None:
+        last_event_id = booking_event_service.get_last_booking_event_id()
+        booking_events = []
+    else:
+        booking_events = booking_event_service.get_booking_events(last_event_id)
+    messages = [f"retry: {booking_stream_retry_milliseconds}\n"]
+    for booking_event in booking_events:
+        logger.debug(f"{booking_event = }")
+        last_event_id = booking_event.booking_event_id
+        message = booking_event_service.render_booking_event(
+            booking_event.kind, booking_event.booking_id
+        )
+        if message:
+            lines = message.splitlines()
+            messages.append("".join(f"data: {line}\n" for line in lines) + "\n")
+    # Sets the client's Last-Event-ID even when nothing here is for them.
+    messages.append(f"id: {last_event_id}\n\n")
+    return Response(
+        "".join(messages),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+@bookings_bp.route("/slots/info", methods=["GET"])
+@login_required
+def get_booking_slots_info():
+    booking_slot_form = booking_service.get_booking_slot_form()
+    return render_template(
+        "bookings/booking_slots_info.html", booking_slot_form=booking_slot_form
+    )
+
+
+@bookings_bp.route("/slots", methods=["GET"])
+@login_required
+def get_booking_slots():
+    booking_slot_form = booking_service.get_booking_slot_form()
+    if not booking_slot_form.validate():
+        logger.error(f"{booking_slot_form.errors = }")
+        return (
+            render_template(
+                "bookings/booking_slots.html",
+                free_slots=[],
+                booking_slot_form=booking_slot_form,
+            ),
+            422,
+        )
+    slot_data = booking_slot_form.data
+    logger.debug(f"{slot_data = }")
+    try:
+        free_slots = booking_service.get_free_slots(
+            service_id=slot_data.get("service_id"),
+            date_min=slot_data.get("date_min"),
+            date_max=slot_data.get("date_max"),
+            user_id=slot_data.get("user_id"),
+        )
+    except ValueError as e:
+        logger.error(f"Invalid free slot window: {e}")
+        booking_slot_form.date_max.errors.append(str(e))
+        return (
+            render_template(
+                "bookings/booking_slots.html",
+                free_slots=[],
+                booking_slot_form=booking_slot_form,
+            ),
+            400,
+        )
+    return render_template("bookings/booking_slots.html", free_slots=free_slots)
 
 
 @bookings_bp.route("/<int:booking_id>", methods=["GET"])
@@ -143,7 +393,15 @@ def update_booking(booking_id: int):
     booking = booking_service.get_booking_by_id(booking_id)
     booking_form = booking_service.get_booking_form()
     logger.debug(f"{booking_form = }")
-    if booking_form.validate_on_submit():
+    is_valid = booking_form.validate_on_submit()
+    if is_valid:
+        # Reject times that overlap another booking for the same walker.
+        conflict_errors = booking_service.get_booking_conflict_errors(
+            booking_form.data | {"repeating_weeks": 0}, exclude_booking_id=booking_id
+        )
+        booking_form.time.errors.extend(conflict_errors)
+        is_valid = not conflict_errors
+    if is_valid:
         booking_data = booking_form.data
         booking_data = booking_data | {
             "updated_at": current_user.user_id,
@@ -169,7 +427,15 @@ def update_booking(booking_id: int):
 def add_booking():
     # Add new booking
     booking_form = booking_service.get_booking_form()
-    if booking_form.validate_on_submit():
+    is_valid = booking_form.validate_on_submit()
+    if is_valid:
+        # Reject times that overlap another booking for the same walker.
+        conflict_errors = booking_service.get_booking_conflict_errors(
+            booking_form.data
+        )
+        booking_form.time.errors.extend(conflict_errors)
+        is_valid = not conflict_errors
+    if is_valid:
         booking_data = booking_form.data
         booking_data = booking_data | {"created_by": current_user.user_id}
         logger.debug(f"{booking_data = }")
@@ -190,6 +456,84 @@ def add_booking():
     return render_template("bookings/booking_form.html", booking_form=booking_form)
 
 
+@bookings_bp.route(
+    "/series/<int:booking_series_id>/<string:date>/edit", methods=["POST"]
+)
+@login_required
+def edit_booking_occurrence(booking_series_id: int, date: str):
+    # Editing an occurrence turns it into a concrete booking first.
+    logger.debug(f"{booking_series_id = } {date = }")
+    booking = booking_series_service.materialize_booking_occurrence(
+        booking_series_id, date, created_by=current_user.user_id
+    )
+    logger.debug(f"{booking = }")
+    if not booking:
+        return "", 404
+    booking_form = booking_service.get_booking_form(
+        booking, ignore_request_data=True
+    )
+    return render_template(
+        "bookings/booking_edit.html", booking=booking, booking_form=booking_form
+    )
+
+
+@bookings_bp.route("/series/<int:booking_series_id>/<string:date>", methods=["DELETE"])
+@login_required
+def delete_booking_occurrence(booking_series_id: int, date: str):
+    logger.debug(f"{booking_series_id = } {date = }")
+    booking_series_service.delete_booking_occurrence(
+        booking_series_id, date, created_by=current_user.user_id
+    )
+    return ""
+
+
+@bookings_bp.route("/bulk", methods=["GET"])
+@login_required
+@admin_user_required
+def get_booking_bulk_form():
+    booking_bulk_form = booking_service.get_booking_bulk_form()
+    return render_template(
+        "bookings/booking_bulk_form.html", booking_bulk_form=booking_bulk_form
+    )
+
+
+@bookings_bp.route("/bulk", methods=["POST"])
+@login_required
+@admin_user_required
+def bulk_update_bookings():
+    booking_bulk_form = booking_service.get_booking_bulk_form()
+    is_valid = booking_bulk_form.validate_on_submit()
+    if is_valid:
+        # Reject changes that would double-book a walker.
+        conflict_errors = booking_service.get_bulk_booking_conflict_errors(
+            booking_bulk_form.data
+        )
+        if booking_bulk_form.action.data == "reassign":
+            booking_bulk_form.new_user_id.errors.extend(conflict_errors)
+        else:
+            booking_bulk_form.days.errors.extend(conflict_errors)
+        is_valid = not conflict_errors
+    if not is_valid:
+        logger.error(f"{booking_bulk_form.errors = }")
+        return (
+            render_template(
+                "bookings/booking_bulk_form.html",
+                booking_bulk_form=booking_bulk_form,
+            ),
+            422,
+        )
+    bulk_data = booking_bulk_form.data
+    logger.debug(f"{bulk_data = }")
+    affected_count = booking_service.bulk_update_bookings(
+        bulk_data, updated_by=current_user.user_id
+    )
+    return render_template(
+        "bookings/booking_bulk_form.html",
+        booking_bulk_form=booking_bulk_form,
+        affected_count=affected_count,
+    )
+
+
 @bookings_bp.route("/<int:booking_id>", methods=["DELETE"])
 @login_required
 def delete_booking_by_id(booking_id: int):
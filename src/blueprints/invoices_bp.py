@@ -1,4 +1,5 @@
 import datetime
+from io import BytesIO
 
 from flask import (
     Blueprint,
@@ -7,11 +8,17 @@ from flask import (
     request,
     send_file,
     send_from_directory,
+    stream_with_context,
 )
 from flask_login import current_user, login_required
 from loguru import logger
 
-from services import invoice_service
+from middleware.http_cache import (
+    is_not_modified,
+    make_not_modified_response,
+    set_validators,
+)
+from services import invoice_export_service, invoice_job_service, invoice_service
 from services.auth_service import admin_user_required
 
 invoices_bp = Blueprint("invoices_bp", __name__)
@@ -49,6 +56,36 @@ def get_invoices():
     return render_template("invoices/invoices.html", invoices=invoices)
 
 
+@invoices_bp.route("/unbilled", methods=["GET"])
+@login_required
+@admin_user_required
+def get_unbilled_bookings():
+    unbilled_bookings = invoice_service.get_unbilled_bookings()
+    return render_template(
+        "invoices/invoices_unbilled.html", unbilled_bookings=unbilled_bookings
+    )
+
+
+@invoices_bp.route("/export.zip", methods=["GET"])
+@login_required
+@admin_user_required
+def export_invoices():
+    try:
+        date_min = datetime.datetime.strptime(request.args["from"], "%Y-%m-%d").date()
+        date_max = datetime.datetime.strptime(request.args["to"], "%Y-%m-%d").date()
+    except (KeyError, ValueError) as e:
+        logger.error(f"Invalid export dates {request.args = }: {e}")
+        return "Expected from and to dates as yyyy-mm-dd", 400
+    logger.debug(f"{date_min = } {date_max = }")
+    invoices_zip = invoice_export_service.get_invoices_zip(date_min, date_max)
+    filename = f"invoices {date_min} {date_max}.zip"
+    return Response(
+        stream_with_context(invoices_zip),
+        mimetype="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
 @invoices_bp.route("/<int:invoice_id>", methods=["GET"])
 @login_required
 # @admin_user_required
@@ -60,6 +97,17 @@ def get_invoice_by_id(invoice_id: int):
     return "", 404
 
 
+@invoices_bp.route("/<int:invoice_id>/lines", methods=["GET"])
+@login_required
+# @admin_user_required
+def get_invoice_lines(invoice_id: int):
+    lines = invoice_service.get_invoice_lines(invoice_id)
+    logger.debug(f"{lines = }")
+    return render_template(
+        "invoices/invoice_lines.html", invoice_id=invoice_id, lines=lines
+    )
+
+
 @invoices_bp.route("/generate", methods=["GET"])
 @login_required
 # @admin_user_required
@@ -146,14 +194,88 @@ def generate_invoice():
     )
 
 
-# @invoices_bp.route("/<int:invoice_id/regenerate", methods=["POST"])
-# @login_required
-# # @admin_user_required
-# def regenerate_invoice(invoice_id: int):
-#     # Add new invoice
-#     invoice = regenerate_invoice_by_id(invoice_id, updated_by=current_user.user_id)
-#     logger.debug(f"{invoice = }")
-#     return render_template()
+@invoices_bp.route("/batch", methods=["GET"])
+@login_required
+@admin_user_required
+def get_invoice_batch_form():
+    invoice_batch_form = invoice_service.get_invoice_batch_form()
+    return render_template(
+        "invoices/invoice_batch_form.html", invoice_batch_form=invoice_batch_form
+    )
+
+
+@invoices_bp.route("/batch", methods=["POST"])
+@login_required
+@admin_user_required
+def generate_invoices():
+    invoice_batch_form = invoice_service.get_invoice_batch_form()
+    if not invoice_batch_form.validate_on_submit():
+        logger.error(f"{invoice_batch_form.errors = }")
+        return (
+            render_template(
+                "invoices/invoice_batch_form.html",
+                invoice_batch_form=invoice_batch_form,
+            ),
+            422,
+        )
+    invoice_results = invoice_service.generate_invoices(
+        invoice_batch_form.date_start.data,
+        invoice_batch_form.date_end.data,
+        created_by=current_user.user_id,
+    )
+    logger.debug(f"{invoice_results = }")
+    return render_template(
+        "invoices/invoice_batch_form.html",
+        invoice_batch_form=invoice_batch_form,
+        invoice_results=invoice_results,
+    )
+
+
+@invoices_bp.route("/<int:invoice_id>/regenerate", methods=["POST"])
+@login_required
+# @admin_user_required
+def regenerate_invoice(invoice_id: int):
+    invoice_changes = invoice_service.regenerate_invoice_by_id(
+        invoice_id, updated_by=current_user.user_id
+    )
+    logger.debug(f"{invoice_changes = }")
+    if not invoice_changes:
+        return "", 404
+    return render_template(
+        "invoices/invoice_regenerate.html",
+        invoice=invoice_changes["invoice"],
+        invoice_changes=invoice_changes,
+    )
+
+
+@invoices_bp.route("/<int:invoice_id>/render", methods=["POST"])
+@login_required
+# @admin_user_required
+def render_invoice_by_id(invoice_id: int):
+    logger.debug(f"{invoice_id = }")
+    invoice_render_job = invoice_job_service.add_invoice_render_job(
+        invoice_id, created_by=current_user.user_id
+    )
+    if not invoice_render_job:
+        return "", 500
+    return render_template(
+        "invoices/invoice_render_job.html", invoice_render_job=invoice_render_job
+    )
+
+
+@invoices_bp.route("/render/<int:invoice_render_job_id>", methods=["GET"])
+@login_required
+# @admin_user_required
+def get_invoice_render_job_by_id(invoice_render_job_id: int):
+    invoice_render_job = invoice_job_service.get_invoice_render_job_by_id(
+        invoice_render_job_id
+    )
+    if not invoice_render_job:
+        return "", 404
+    invoice_job_service.advance_invoice_render_job(invoice_render_job)
+    return render_template(
+        "invoices/invoice_render_job.html", invoice_render_job=invoice_render_job
+    )
 
 
 @invoices_bp.route("/<int:invoice_id>/download", methods=["GET"])
@@ -161,15 +283,25 @@ def generate_invoice():
 # @admin_user_required
 def download_invoice_by_id(invoice_id: int):
     logger.debug(f"{invoice_id = }")
-    result = invoice_service.download_invoice_by_id(invoice_id)
-    logger.debug(f"{result = }")
-    pdf_file, pdf_outpath = result
-    return send_file(
-        pdf_file,
+    invoice = invoice_service.get_invoice_by_id(invoice_id)
+    if not invoice:
+        return "", 404
+    # Revalidate before rendering; an unchanged invoice is answered with a 304.
+    etag = invoice_service.get_invoice_pdf_etag(invoice)
+    if is_not_modified(etag):
+        return make_not_modified_response(etag)
+    result = invoice_service.download_invoice(invoice, etag)
+    if not result:
+        return "", 500
+    pdf_bytes, pdf_outpath = result
+    response = send_file(
+        BytesIO(pdf_bytes),
         as_attachment=True,
         download_name=pdf_outpath,
         mimetype="application/pdf",
     )
+    last_modified = invoice.updated_at or invoice.created_at
+    return set_validators(response, etag, last_modified=last_modified)
 
 
 @invoices_bp.route("/<int:invoice_id>", methods=["DELETE"])
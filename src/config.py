@@ -38,3 +38,8 @@ class Config:
     SECRET_KEY = os.getenv("SECRET_KEY")
     if not SECRET_KEY:
         raise ValueError("SECRET_KEY environment variable is not set")
+
+    # Invoice render jobs run on background threads, except on serverless hosts
+    # (Vercel sets VERCEL) that freeze threads once the response is sent. There
+    # the job's status polls claim and render it instead.
+    INVOICE_RENDER_IN_BACKGROUND = not os.getenv("VERCEL")
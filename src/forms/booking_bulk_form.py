@@ -0,0 +1,54 @@
+from flask_wtf import FlaskForm
+from wtforms import DateField, IntegerField, SelectField
+from wtforms.validators import DataRequired, Optional
+
+from services import customer_service, user_service
+
+
+class BookingBulkForm(FlaskForm):
+    user_id = SelectField("Bookings walked by", coerce=int, validators=[Optional()])
+    customer_id = SelectField("For owner", coerce=int, validators=[Optional()])
+    date_min = DateField(
+        "From this date",
+        validators=[DataRequired()],
+        format="%Y-%m-%d",
+        render_kw={"placeholder": "yyyy-mm-dd"},
+    )
+    date_max = DateField(
+        "Up to and including this date",
+        validators=[DataRequired()],
+        format="%Y-%m-%d",
+        render_kw={"placeholder": "yyyy-mm-dd"},
+    )
+    action = SelectField(
+        "Action",
+        choices=[
+            ("reassign", "Reassign to walker"),
+            ("shift", "Shift by number of days"),
+            ("delete", "Delete"),
+        ],
+        validators=[DataRequired()],
+    )
+    new_user_id = SelectField("Reassign to", coerce=int, validators=[Optional()])
+    days = IntegerField("Shift by days", default=0, validators=[Optional()])
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        users = [(user.user_id, user.name) for user in user_service.get_users()]
+        self.user_id.choices = [(-1, "All")] + users
+        self.new_user_id.choices = users
+        self.customer_id.choices = [(-1, "All")] + [
+            (customer.customer_id, customer.name)
+            for customer in customer_service.get_customers()
+        ]
+
+    def validate(self, extra_validators=None):
+        if not super().validate(extra_validators=extra_validators):
+            return False
+        if self.action.data == "shift" and not self.days.data:
+            self.days.errors.append("Enter a non-zero number of days.")
+            return False
+        if self.action.data == "reassign" and not self.new_user_id.data:
+            self.new_user_id.errors.append("Choose a walker to reassign to.")
+            return False
+        return True
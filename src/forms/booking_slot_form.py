@@ -0,0 +1,39 @@
+from datetime import date, timedelta
+
+from flask_wtf import FlaskForm
+from wtforms import DateField, SelectField
+from wtforms.validators import DataRequired, Optional
+
+from services import service_service, user_service
+
+
+class BookingSlotForm(FlaskForm):
+    class Meta:
+        csrf = False
+
+    service_id = SelectField("For the service", coerce=int, validators=[DataRequired()])
+    user_id = SelectField("With walker", coerce=int, validators=[Optional()])
+    date_min = DateField(
+        "From this date",
+        validators=[DataRequired()],
+        format="%Y-%m-%d",
+        default=date.today,
+        render_kw={"placeholder": "yyyy-mm-dd"},
+    )
+    date_max = DateField(
+        "Up to and including this date",
+        validators=[DataRequired()],
+        format="%Y-%m-%d",
+        default=lambda: date.today() + timedelta(weeks=4),
+        render_kw={"placeholder": "yyyy-mm-dd"},
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.service_id.choices = [
+            (service.service_id, service.name)
+            for service in service_service.get_services(is_active=True)
+        ]
+        self.user_id.choices = [(-1, "All")] + [
+            (user.user_id, user.name) for user in user_service.get_users()
+        ]
@@ -0,0 +1,17 @@
+from datetime import date
+
+from flask_wtf import FlaskForm
+from wtforms import DateField
+from wtforms.validators import DataRequired
+
+
+class InvoiceBatchForm(FlaskForm):
+    date_start = DateField(
+        "Start Date",
+        validators=[DataRequired()],
+        format="%Y-%m-%d",
+    )
+
+    date_end = DateField(
+        "End Date", validators=[DataRequired()], format="%Y-%m-%d", default=date.today()
+    )
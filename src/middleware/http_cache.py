@@ -0,0 +1,102 @@
+import hashlib
+import time
+
+from flask import current_app, request, Response, session
+from flask_wtf.csrf import generate_csrf
+from loguru import logger
+
+
+def get_csrf_bucket() -> int:
+    """
+    Returns the current half of the CSRF time limit.
+
+    Fragments embed CSRF tokens, so anything cached from a rendered fragment
+    must be keyed on this. A cached fragment is then never reused once its
+    tokens could have expired.
+
+    Returns:
+        int: A counter that advances every half CSRF time limit.
+    """
+    csrf_time_limit = current_app.config.get("WTF_CSRF_TIME_LIMIT") or 0
+    if not csrf_time_limit:
+        return 0
+    return int(time.time() // (csrf_time_limit / 2))
+
+
+def get_csrf_key() -> tuple:
+    """
+    Identifies the CSRF tokens a fragment rendered now would embed.
+
+    Tokens are signed from a secret kept in the session, so they are only
+    valid for that session. Anything cached from a rendered fragment must be
+    keyed on this rather than on the time bucket alone.
+
+    Returns:
+        tuple: The session's CSRF secret and the current CSRF bucket.
+    """
+    # Makes sure the session holds its secret before the first render.
+    generate_csrf()
+    field_name = current_app.config.get("WTF_CSRF_FIELD_NAME", "csrf_token")
+    return session.get(field_name), get_csrf_bucket()
+
+
+def get_etag(*parts) -> str:
+    """
+    Builds a strong validator from the given parts and the CSRF key.
+
+    Args:
+        *parts: Values that identify the state of the rendered resource.
+
+    Returns:
+        str: A hex digest suitable for an ETag header.
+    """
+    value = "|".join(f"{part}" for part in (*parts, *get_csrf_key()))
+    etag = hashlib.sha256(value.encode("UTF-8")).hexdigest()
+    return etag
+
+
+def is_not_modified(etag: str) -> bool:
+    """
+    Checks whether the client already holds the representation for an ETag.
+
+    Args:
+        etag (str): The validator of the current representation.
+
+    Returns:
+        bool: True if the request's If-None-Match matches the ETag.
+    """
+    return request.if_none_match.contains(etag)
+
+
+def make_not_modified_response(etag: str) -> Response:
+    """
+    Creates an empty 304 Not Modified response carrying the ETag.
+
+    Args:
+        etag (str): The validator of the current representation.
+
+    Returns:
+        Response: The 304 response.
+    """
+    logger.debug(f"Not modified {etag = }")
+    response = Response(status=304)
+    return set_validators(response, etag)
+
+
+def set_validators(response: Response, etag: str, last_modified=None) -> Response:
+    """
+    Adds validators so that browsers revalidate rather than re-fetch.
+
+    Args:
+        response (Response): The response object to be modified.
+        etag (str): The validator of the representation.
+        last_modified (datetime, optional): When the representation last changed.
+
+    Returns:
+        Response: The modified response object.
+    """
+    response.set_etag(etag)
+    if last_modified:
+        response.last_modified = last_modified
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
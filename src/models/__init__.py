@@ -4,7 +4,15 @@ from .vet import Vet
 from .dog import Dog
 from .service import Service
 from .booking import Booking
+from .booking_series import BookingSeries
+from .booking_series_exception import BookingSeriesException
+from .booking_audit import BookingAudit
+from .booking_event import BookingEvent
+from .user_workload import UserWorkload
 from .invoice import Invoice
+from .invoice_line import InvoiceLine
+from .invoice_pdf import InvoicePdf
+from .invoice_render_job import InvoiceRenderJob
 from .expense import Expense
 
 # from .income_statememt import IncomeStatememt
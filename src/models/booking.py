@@ -4,6 +4,19 @@ from app import db
 
 
 class Booking(db.Model):
+    __table_args__ = (
+        db.Index("ix_booking_date_time", "date", "time"),
+        db.Index("ix_booking_user_id_date", "user_id", "date"),
+        db.Index("ix_booking_customer_id_date", "customer_id", "date"),
+        db.Index("ix_booking_invoice_id", "invoice_id"),
+        db.Index(
+            "ix_booking_unbilled_customer_id_date",
+            "customer_id",
+            "date",
+            postgresql_where=db.text("invoice_id IS NULL"),
+        ),
+    )
+
     booking_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
 
     date = db.Column(db.Date, nullable=False)
@@ -26,6 +39,10 @@ class Booking(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=True)
     user = db.relationship("User", backref="booking", foreign_keys=[user_id])
 
+    booking_series_id = db.Column(
+        db.Integer, db.ForeignKey("booking_series.booking_series_id"), nullable=True
+    )
+
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=True)
     created_by = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=True)
     updated_at = db.Column(db.DateTime, nullable=True)
@@ -0,0 +1,16 @@
+import datetime
+
+from app import db
+
+
+class BookingAudit(db.Model):
+    booking_audit_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    # One record per bulk operation: what was done, to which filter, and how
+    # many bookings it touched.
+    action = db.Column(db.String(50), nullable=False)
+    parameters = db.Column(db.String(2000), nullable=False, default="{}")
+    affected_count = db.Column(db.Integer, nullable=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=True)
@@ -0,0 +1,17 @@
+import datetime
+
+from app import db
+
+
+class BookingEvent(db.Model):
+    booking_event_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    # A committed change to one booking, read by every open booking board
+    # whichever instance serves it. Deleted bookings keep their events, so
+    # `booking_id` is not a foreign key.
+    kind = db.Column(db.String(20), nullable=False)
+    booking_id = db.Column(db.Integer, nullable=False)
+
+    created_at = db.Column(
+        db.DateTime, default=datetime.datetime.utcnow, nullable=False, index=True
+    )
@@ -0,0 +1,42 @@
+import datetime
+
+from app import db
+
+
+class BookingSeries(db.Model):
+    booking_series_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    # Recurrence rule: every `interval_weeks` weeks on `weekdays` (comma
+    # separated, Monday is 0) from `date_start`, up to `date_until` and/or
+    # `count` occurrences.
+    date_start = db.Column(db.Date, nullable=False)
+    time = db.Column(db.Time, nullable=False)
+    interval_weeks = db.Column(db.Integer, nullable=False, default=1)
+    weekdays = db.Column(db.String(20), nullable=False)
+    date_until = db.Column(db.Date, nullable=True)
+    count = db.Column(db.Integer, nullable=True)
+
+    customer_id = db.Column(
+        db.Integer, db.ForeignKey("customer.customer_id"), nullable=False
+    )
+    customer = db.relationship("Customer", backref="booking_series")
+
+    service_id = db.Column(
+        db.Integer, db.ForeignKey("service.service_id"), nullable=False
+    )
+    service = db.relationship("Service", backref="booking_series")
+
+    user_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=True)
+    user = db.relationship("User", backref="booking_series", foreign_keys=[user_id])
+
+    exceptions = db.relationship(
+        "BookingSeriesException",
+        backref="booking_series",
+        lazy="selectin",
+        cascade="all, delete-orphan",
+    )
+
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
+    updated_by = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=True)
@@ -0,0 +1,25 @@
+import datetime
+
+from app import db
+
+
+class BookingSeriesException(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint(
+            "booking_series_id", "date", name="uq_booking_series_exception_date"
+        ),
+    )
+
+    booking_series_exception_id = db.Column(
+        db.Integer, primary_key=True, autoincrement=True
+    )
+
+    # An occurrence that is no longer expanded from the rule, either because
+    # it was cancelled or because it now exists as a concrete booking.
+    booking_series_id = db.Column(
+        db.Integer, db.ForeignKey("booking_series.booking_series_id"), nullable=False
+    )
+    date = db.Column(db.Date, nullable=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=True)
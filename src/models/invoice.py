@@ -12,9 +12,9 @@ class Invoice(db.Model):
     date_due = db.Column(db.Date, nullable=True)
     date_paid = db.Column(db.Date, nullable=True)
 
-    price_subtotal = db.Column(db.Float, nullable=False)
-    price_discount = db.Column(db.Float, nullable=False)
-    price_total = db.Column(db.Float, nullable=False)
+    price_subtotal = db.Column(db.Numeric(10, 2), nullable=False)
+    price_discount = db.Column(db.Numeric(10, 2), nullable=False)
+    price_total = db.Column(db.Numeric(10, 2), nullable=False)
 
     bookings = db.relationship("Booking", backref="invoice")
 
@@ -0,0 +1,26 @@
+from app import db
+
+
+class InvoiceLine(db.Model):
+    __table_args__ = (
+        db.Index("ix_invoice_line_invoice_id_date_time", "invoice_id", "date", "time"),
+    )
+
+    invoice_line_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    # A booking as it was billed, so later service changes leave old invoices alone.
+    invoice_id = db.Column(
+        db.Integer, db.ForeignKey("invoice.invoice_id"), nullable=False
+    )
+    invoice = db.relationship(
+        "Invoice", backref=db.backref("lines", cascade="all, delete-orphan")
+    )
+    booking_id = db.Column(
+        db.Integer,
+        db.ForeignKey("booking.booking_id", ondelete="SET NULL"),
+        nullable=True,
+    )
+    date = db.Column(db.Date, nullable=False)
+    time = db.Column(db.Time, nullable=False)
+    service_name = db.Column(db.String(255), nullable=False)
+    price = db.Column(db.Numeric(10, 2), nullable=False)
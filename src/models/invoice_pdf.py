@@ -0,0 +1,19 @@
+import datetime
+
+from app import db
+
+
+class InvoicePdf(db.Model):
+    invoice_pdf_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    # A rendered invoice, keyed by a hash of everything the PDF shows.
+    content_hash = db.Column(db.String(64), nullable=False, unique=True)
+    invoice_id = db.Column(
+        db.Integer, db.ForeignKey("invoice.invoice_id"), nullable=False, index=True
+    )
+    invoice = db.relationship(
+        "Invoice", backref=db.backref("pdfs", cascade="all, delete-orphan")
+    )
+    data = db.Column(db.LargeBinary, nullable=False)
+
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=True)
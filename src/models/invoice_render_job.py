@@ -0,0 +1,22 @@
+import datetime
+
+from app import db
+
+
+class InvoiceRenderJob(db.Model):
+    invoice_render_job_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    # One queued PDF render: pending -> running -> done or failed.
+    invoice_id = db.Column(
+        db.Integer, db.ForeignKey("invoice.invoice_id"), nullable=False, index=True
+    )
+    invoice = db.relationship(
+        "Invoice", backref=db.backref("render_jobs", cascade="all, delete-orphan")
+    )
+    status = db.Column(db.String(20), nullable=False, default="pending")
+    content_hash = db.Column(db.String(64), nullable=True)
+    error = db.Column(db.String(500), nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow, nullable=True)
+    created_by = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=True)
+    updated_at = db.Column(db.DateTime, nullable=True)
@@ -6,7 +6,7 @@ from app import db
 class Service(db.Model):
     service_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     name = db.Column(db.String(255), nullable=False)
-    price = db.Column(db.Float, nullable=False)
+    price = db.Column(db.Numeric(10, 2), nullable=False)
     description = db.Column(db.String(500), default="", nullable=False)
     duration = db.Column(db.Float, nullable=True)
     is_publicly_offered = db.Column(db.Boolean, default=True)
@@ -0,0 +1,16 @@
+from app import db
+
+
+class UserWorkload(db.Model):
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "week_start", name="uq_user_workload_week"),
+    )
+
+    user_workload_id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+
+    # Rollup of one walker's bookings in the ISO week starting `week_start`.
+    user_id = db.Column(db.Integer, db.ForeignKey("user.user_id"), nullable=False)
+    user = db.relationship("User", backref="workloads", foreign_keys=[user_id])
+    week_start = db.Column(db.Date, nullable=False)
+    booking_count = db.Column(db.Integer, nullable=False, default=0)
+    minutes = db.Column(db.Float, nullable=False, default=0.0)
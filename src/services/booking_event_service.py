@@ -0,0 +1,124 @@
+import datetime
+from typing import Optional
+
+from flask import render_template
+from flask_login import current_user
+from loguru import logger
+from sqlalchemy import event, func
+
+from app import db
+from models.booking import Booking
+from models.booking_event import BookingEvent
+
+# Events sent to a board per poll; the rest follow on the next poll.
+max_booking_events = 100
+
+# Boards poll every few seconds, so older events are never read again.
+booking_event_retention = datetime.timedelta(hours=1)
+
+# Polls prune old events at most this often per process, so neither polls
+# nor booking writes pay for a DELETE each time.
+booking_event_prune_interval = datetime.timedelta(minutes=10)
+
+_pruned_at = None
+
+
+def publish(booking_events: list[tuple]) -> None:
+    """
+    Records (kind, booking_id) events in the current transaction. Booking
+    boards poll for them once the transaction commits, on any instance.
+    """
+    if not booking_events:
+        return
+    db.session.execute(
+        BookingEvent.__table__.insert(),
+        [
+            {"kind": kind, "booking_id": booking_id}
+            for kind, booking_id in booking_events
+        ],
+    )
+
+
+def prune_booking_events() -> None:
+    """
+    Deletes events older than `booking_event_retention`, unless this process
+    already did so within `booking_event_prune_interval`.
+    """
+    global _pruned_at
+    now = datetime.datetime.utcnow()
+    if _pruned_at and now - _pruned_at < booking_event_prune_interval:
+        return
+    _pruned_at = now
+    table = BookingEvent.__table__
+    try:
+        db.session.execute(
+            table.delete().where(table.c.created_at < now - booking_event_retention)
+        )
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"Failed to prune booking events: {e}")
+        db.session.rollback()
+
+
+def get_last_booking_event_id() -> int:
+    last_booking_event_id = db.session.query(
+        func.max(BookingEvent.booking_event_id)
+    ).scalar()
+    return last_booking_event_id or 0
+
+
+def get_booking_events(booking_event_id: int) -> list[BookingEvent]:
+    """Returns the events committed after `booking_event_id`, oldest first."""
+    query = db.session.query(BookingEvent)
+    query = query.filter(BookingEvent.booking_event_id > booking_event_id)
+    query = query.order_by(BookingEvent.booking_event_id)
+    booking_events = query.limit(max_booking_events).all()
+    return booking_events
+
+
+def render_booking_event(kind: str, booking_id: int) -> Optional[str]:
+    """
+    Renders a booking change as an HTMX out-of-band swap of its table row:
+    updated rows replace `bookings-{booking_id}`, new rows are prepended to
+    the shown table and deleted rows are removed.
+    """
+    if kind == "deleted":
+        return f'<tr id="bookings-{booking_id}" hx-swap-oob="delete"></tr>'
+    booking = db.session.get(Booking, booking_id, populate_existing=True)
+    if not booking:
+        return
+    if not current_user.is_admin and booking.user_id != current_user.user_id:
+        return
+    if kind == "inserted":
+        booking_row = render_template("bookings/booking_detail.html", booking=booking)
+        return f'<tbody hx-swap-oob="afterbegin:#bookings tbody">{booking_row}</tbody>'
+    return render_template(
+        "bookings/booking_detail.html", booking=booking, swap_oob="true"
+    )
+
+
+@event.listens_for(db.session, "after_flush")
+def _collect_booking_events(session, flush_context):
+    booking_events = session.info.setdefault("booking_events", [])
+    for kind, instances in (
+        ("inserted", session.new),
+        ("updated", session.dirty),
+        ("deleted", session.deleted),
+    ):
+        for instance in instances:
+            if isinstance(instance, Booking) and instance.booking_id:
+                booking_events.append((kind, instance.booking_id))
+
+
+@event.listens_for(db.session, "after_flush_postexec")
+def _publish_booking_events(session, flush_context):
+    booking_events = session.info.pop("booking_events", [])
+    if booking_events:
+        logger.debug(f"Publishing {booking_events = }")
+        with session.no_autoflush:
+            publish(booking_events)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_booking_events(session):
+    session.info.pop("booking_events", None)
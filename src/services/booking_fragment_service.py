@@ -0,0 +1,93 @@
+from collections import OrderedDict
+import datetime
+import threading
+
+from flask import render_template
+from flask_login import current_user
+from flask_wtf.csrf import generate_csrf
+from loguru import logger
+from markupsafe import Markup
+from sqlalchemy import event
+
+from app import db
+from models.booking import Booking
+
+# Upper bound on rendered booking rows kept in memory per process.
+max_cached_booking_rows = 2000
+
+# Stands in for the CSRF token in cached rows. Tokens are only valid for
+# the session that issued them, so each request fills in its own.
+csrf_token_placeholder = "__booking_row_csrf_token__"
+
+_booking_rows = OrderedDict()
+_booking_rows_lock = threading.Lock()
+
+
+def get_booking_row_key(booking: Booking) -> tuple:
+    # Everything booking_detail.html renders, so a stale row is never served.
+    is_today = booking.date == datetime.datetime.utcnow().date()
+    return (
+        booking.booking_id,
+        booking.updated_at,
+        current_user.is_admin,
+        is_today,
+        booking.date,
+        booking.time,
+        booking.user.name if booking.user else None,
+        booking.customer.name,
+        booking.service.name,
+    )
+
+
+def render_booking_row(booking: Booking) -> Markup:
+    """Renders booking_detail.html for a booking, reusing a cached row."""
+    if not booking.booking_id:
+        return Markup(render_template("bookings/booking_detail.html", booking=booking))
+    key = get_booking_row_key(booking)
+    with _booking_rows_lock:
+        booking_row = _booking_rows.get(key)
+        if booking_row is not None:
+            _booking_rows.move_to_end(key)
+    if booking_row is None:
+        booking_row = render_template(
+            "bookings/booking_detail.html",
+            booking=booking,
+            csrf_token=lambda: csrf_token_placeholder,
+        )
+        with _booking_rows_lock:
+            _booking_rows[key] = booking_row
+            while len(_booking_rows) > max_cached_booking_rows:
+                _booking_rows.popitem(last=False)
+    return Markup(booking_row.replace(csrf_token_placeholder, generate_csrf()))
+
+
+def invalidate_booking_rows(booking_ids: set) -> None:
+    if not booking_ids:
+        return
+    logger.debug(f"Invalidating booking rows {booking_ids = }")
+    with _booking_rows_lock:
+        for key in [key for key in _booking_rows if key[0] in booking_ids]:
+            del _booking_rows[key]
+
+
+def clear_booking_rows() -> None:
+    with _booking_rows_lock:
+        _booking_rows.clear()
+
+
+@event.listens_for(db.session, "after_flush")
+def _collect_changed_bookings(session, flush_context):
+    changed_booking_ids = session.info.setdefault("changed_booking_ids", set())
+    for instance in (*session.dirty, *session.deleted):
+        if isinstance(instance, Booking) and instance.booking_id:
+            changed_booking_ids.add(instance.booking_id)
+
+
+@event.listens_for(db.session, "after_commit")
+def _invalidate_changed_bookings(session):
+    invalidate_booking_rows(session.info.pop("changed_booking_ids", set()))
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_changed_bookings(session):
+    session.info.pop("changed_booking_ids", None)
@@ -0,0 +1,391 @@
+import datetime
+import heapq
+from typing import Iterator, Optional
+
+from loguru import logger
+from sqlalchemy import func, or_
+from sqlalchemy.orm import joinedload
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app import db
+from models.booking import Booking
+from models.booking_series import BookingSeries
+from models.booking_series_exception import BookingSeriesException
+
+booking_date_format = "%Y-%m-%d"
+
+# How far ahead open-ended series are expanded when a read has no upper date.
+series_horizon_weeks = 52
+
+
+def _to_date(value) -> Optional[datetime.date]:
+    if not value:
+        return
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.datetime.strptime(f"{value}"[:10], booking_date_format).date()
+
+
+def _to_date_max(value) -> Optional[datetime.date]:
+    # `date_max` is exclusive, but a datetime bound includes its own day.
+    date_max = _to_date(value)
+    if isinstance(value, datetime.datetime) and value.time() != datetime.time.min:
+        date_max += datetime.timedelta(days=1)
+    return date_max
+
+
+def get_weekdays(booking_series: BookingSeries) -> list[int]:
+    weekdays = [int(weekday) for weekday in booking_series.weekdays.split(",")]
+    return sorted(set(weekdays))
+
+
+def get_occurrence_dates(
+    booking_series: BookingSeries,
+    date_min: Optional[datetime.date] = None,
+    date_max: Optional[datetime.date] = None,
+) -> Iterator[datetime.date]:
+    """
+    Yields the dates of a series inside [date_min, date_max), in order.
+
+    Series without a count skip straight to the first week of the window, so
+    the cost depends on the window size rather than the age of the series.
+    """
+    weekdays = get_weekdays(booking_series)
+    interval = datetime.timedelta(weeks=booking_series.interval_weeks or 1)
+    date_start = booking_series.date_start
+    week_start = date_start - datetime.timedelta(days=date_start.weekday())
+    if date_min and not booking_series.count and date_min > week_start:
+        weeks_skipped = (date_min - week_start).days // interval.days
+        week_start += weeks_skipped * interval
+    number_of_occurrences = 0
+    while True:
+        for weekday in weekdays:
+            date = week_start + datetime.timedelta(days=weekday)
+            if date < date_start:
+                continue
+            if booking_series.date_until and date > booking_series.date_until:
+                return
+            if booking_series.count and number_of_occurrences >= booking_series.count:
+                return
+            if date_max and date >= date_max:
+                return
+            number_of_occurrences += 1
+            if date_min and date < date_min:
+                continue
+            yield date
+        week_start += interval
+
+
+def get_occurrence_dates_descending(
+    booking_series: BookingSeries,
+    date_min: Optional[datetime.date] = None,
+    date_max: Optional[datetime.date] = None,
+) -> Iterator[datetime.date]:
+    """
+    Yields the dates of a series inside [date_min, date_max), latest first.
+
+    Series without a count start from the last week of the window and walk
+    back, so only the dates that are actually consumed get built.
+    """
+    if booking_series.count:
+        # The count is anchored at the start, so these walk forward once.
+        dates = list(get_occurrence_dates(booking_series, date_min, date_max))
+        yield from reversed(dates)
+        return
+    date_end = date_max - datetime.timedelta(days=1)
+    if booking_series.date_until and booking_series.date_until < date_end:
+        date_end = booking_series.date_until
+    date_first = booking_series.date_start
+    if date_min and date_min > date_first:
+        date_first = date_min
+    if date_end < date_first:
+        return
+    weekdays = get_weekdays(booking_series)
+    interval = datetime.timedelta(weeks=booking_series.interval_weeks or 1)
+    date_start = booking_series.date_start
+    week_start = date_start - datetime.timedelta(days=date_start.weekday())
+    weeks_skipped = (date_end - week_start).days // interval.days
+    week_start += weeks_skipped * interval
+    while True:
+        for weekday in reversed(weekdays):
+            date = week_start + datetime.timedelta(days=weekday)
+            if date > date_end:
+                continue
+            if date < date_first:
+                return
+            yield date
+        week_start -= interval
+
+
+def get_booking_occurrence(
+    booking_series: BookingSeries, date: datetime.date
+) -> Booking:
+    # A transient booking that is never added to the session. Relationships
+    # are set without events so nothing cascades into a flush.
+    occurrence = Booking(
+        date=date,
+        time=booking_series.time,
+        customer_id=booking_series.customer_id,
+        service_id=booking_series.service_id,
+        user_id=booking_series.user_id,
+        booking_series_id=booking_series.booking_series_id,
+    )
+    set_committed_value(occurrence, "customer", booking_series.customer)
+    set_committed_value(occurrence, "service", booking_series.service)
+    set_committed_value(occurrence, "user", booking_series.user)
+    return occurrence
+
+
+def get_booking_series(
+    user_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+    date_min: Optional[datetime.date] = None,
+    date_max: Optional[datetime.date] = None,
+) -> list[BookingSeries]:
+    query = db.session.query(BookingSeries).options(
+        joinedload(BookingSeries.user),
+        joinedload(BookingSeries.customer),
+        joinedload(BookingSeries.service),
+    )
+    if user_id and int(user_id) > -1:
+        query = query.filter(BookingSeries.user_id == user_id)
+    if customer_id and int(customer_id) > -1:
+        query = query.filter(BookingSeries.customer_id == customer_id)
+    if date_min:
+        query = query.filter(
+            or_(BookingSeries.date_until.is_(None), BookingSeries.date_until >= date_min)
+        )
+    if date_max:
+        query = query.filter(BookingSeries.date_start < date_max)
+    booking_series = query.all()
+    return booking_series
+
+
+def get_last_invoiced_dates() -> dict[int, datetime.date]:
+    """Returns the latest invoiced booking date of each series by its id."""
+    query = (
+        db.session.query(Booking.booking_series_id, func.max(Booking.date))
+        .filter(
+            Booking.booking_series_id.is_not(None), Booking.invoice_id.is_not(None)
+        )
+        .group_by(Booking.booking_series_id)
+    )
+    last_invoiced_dates = dict(query.all())
+    return last_invoiced_dates
+
+
+def get_booking_series_by_id(booking_series_id: int) -> Optional[BookingSeries]:
+    booking_series = db.session.get(BookingSeries, booking_series_id)
+    return booking_series
+
+
+def get_booking_occurrences(
+    user_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+    date_min=None,
+    date_max=None,
+    descending: bool = False,
+    cursor_date: Optional[datetime.date] = None,
+    series_date_mins: Optional[dict[int, datetime.date]] = None,
+) -> Iterator[Booking]:
+    """
+    Yields the occurrences of every matching series in the requested window,
+    ordered by date then time (or latest date first when `descending`).
+
+    Series are expanded lazily and merged, so a caller that stops after a
+    page only builds that page. `cursor_date` narrows the window to the
+    dates on or after (on or before when `descending`) a keyset cursor, and
+    `series_date_mins` raises `date_min` for individual series by id.
+    """
+    date_min = _to_date(date_min)
+    date_max = _to_date_max(date_max)
+    if not date_max:
+        today = datetime.datetime.now().date()
+        date_max = today + datetime.timedelta(weeks=series_horizon_weeks)
+    if cursor_date and descending:
+        date_max = min(date_max, cursor_date + datetime.timedelta(days=1))
+    elif cursor_date:
+        date_min = max(date_min, cursor_date) if date_min else cursor_date
+    booking_series = get_booking_series(user_id, customer_id, date_min, date_max)
+    logger.debug(f"{booking_series = }")
+
+    if descending:
+        get_dates = get_occurrence_dates_descending
+    else:
+        get_dates = get_occurrence_dates
+
+    def _expand(series: BookingSeries) -> Iterator[Booking]:
+        series_date_min = date_min
+        if series_date_mins and series.booking_series_id in series_date_mins:
+            series_date_min = series_date_mins[series.booking_series_id]
+            if date_min:
+                series_date_min = max(series_date_min, date_min)
+        exception_dates = {exception.date for exception in series.exceptions}
+        for date in get_dates(series, series_date_min, date_max):
+            if date not in exception_dates:
+                yield get_booking_occurrence(series, date)
+
+    def _sort_key(booking: Booking) -> tuple:
+        date_key = booking.date.toordinal()
+        if descending:
+            date_key = -date_key
+        return date_key, booking.time, -booking.booking_series_id
+
+    yield from heapq.merge(
+        *[_expand(series) for series in booking_series], key=_sort_key
+    )
+
+
+def add_booking_series(booking_data: dict) -> Optional[BookingSeries]:
+    date_start = _to_date(booking_data.get("date"))
+    time = booking_data.get("time")
+    if isinstance(time, str):
+        time = datetime.datetime.strptime(time, "%H:%M:%S").time()
+    count = booking_data.get("count")
+    if count is None and booking_data.get("repeating_weeks"):
+        count = booking_data.get("repeating_weeks") + 1
+    weekdays = booking_data.get("weekdays") or f"{date_start.weekday()}"
+    new_booking_series = BookingSeries(
+        date_start=date_start,
+        time=time,
+        interval_weeks=booking_data.get("interval_weeks") or 1,
+        weekdays=weekdays,
+        date_until=booking_data.get("date_until"),
+        count=count,
+        customer_id=booking_data.get("customer_id"),
+        service_id=booking_data.get("service_id"),
+        user_id=booking_data.get("user_id"),
+        created_at=booking_data.get("created_at"),
+        created_by=booking_data.get("created_by"),
+    )
+    try:
+        db.session.add(new_booking_series)
+        db.session.commit()
+        logger.debug(f"{new_booking_series = }")
+        return new_booking_series
+    except Exception as e:
+        logger.error(f"Error adding booking series: {e}")
+        db.session.rollback()
+        return
+
+
+def _add_exception(
+    booking_series: BookingSeries, date: datetime.date, created_by: Optional[int]
+) -> bool:
+    if date in {exception.date for exception in booking_series.exceptions}:
+        return False
+    if date not in get_occurrence_dates(
+        booking_series, date, date + datetime.timedelta(days=1)
+    ):
+        return False
+    booking_series.exceptions.append(
+        BookingSeriesException(date=date, created_by=created_by)
+    )
+    return True
+
+
+def materialize_booking_occurrence(
+    booking_series_id: int, date, created_by: Optional[int] = None
+) -> Optional[Booking]:
+    """Turns one occurrence of a series into a concrete booking row."""
+    booking_series = get_booking_series_by_id(booking_series_id)
+    date = _to_date(date)
+    if not booking_series or not _add_exception(booking_series, date, created_by):
+        logger.error(f"Occurrence {booking_series_id = } {date = } not found.")
+        return
+    new_booking = Booking(
+        date=date,
+        time=booking_series.time,
+        customer_id=booking_series.customer_id,
+        service_id=booking_series.service_id,
+        user_id=booking_series.user_id,
+        booking_series_id=booking_series.booking_series_id,
+        created_by=created_by,
+    )
+    try:
+        db.session.add(new_booking)
+        db.session.commit()
+        logger.debug(f"{new_booking = }")
+        return new_booking
+    except Exception as e:
+        logger.error(f"Error materializing booking occurrence: {e}")
+        db.session.rollback()
+        return
+
+
+def add_booking_occurrences(
+    customer_id: Optional[int] = None,
+    date_min=None,
+    date_max=None,
+    created_by: Optional[int] = None,
+    user_id: Optional[int] = None,
+) -> list[Booking]:
+    """
+    Adds a concrete booking for every occurrence in a window to the session
+    without committing, so callers can make it part of a larger change.
+    """
+    occurrences = list(
+        get_booking_occurrences(
+            user_id=user_id,
+            customer_id=customer_id,
+            date_min=date_min,
+            date_max=date_max,
+        )
+    )
+    new_bookings = []
+    for occurrence in occurrences:
+        booking_series = get_booking_series_by_id(occurrence.booking_series_id)
+        _add_exception(booking_series, occurrence.date, created_by)
+        new_bookings.append(
+            Booking(
+                date=occurrence.date,
+                time=occurrence.time,
+                customer_id=occurrence.customer_id,
+                service_id=occurrence.service_id,
+                user_id=occurrence.user_id,
+                booking_series_id=occurrence.booking_series_id,
+                created_by=created_by,
+            )
+        )
+    db.session.add_all(new_bookings)
+    return new_bookings
+
+
+def materialize_booking_occurrences(
+    customer_id: Optional[int] = None,
+    date_min=None,
+    date_max=None,
+    created_by: Optional[int] = None,
+    user_id: Optional[int] = None,
+) -> list[Booking]:
+    """Turns every occurrence in a window into concrete bookings, e.g. to invoice."""
+    try:
+        new_bookings = add_booking_occurrences(
+            customer_id, date_min, date_max, created_by, user_id
+        )
+        if not new_bookings:
+            return []
+        db.session.commit()
+        logger.debug(f"{new_bookings = }")
+        return new_bookings
+    except Exception as e:
+        logger.error(f"Error materializing booking occurrences: {e}")
+        db.session.rollback()
+        return []
+
+
+def delete_booking_occurrence(
+    booking_series_id: int, date, created_by: Optional[int] = None
+) -> None:
+    booking_series = get_booking_series_by_id(booking_series_id)
+    date = _to_date(date)
+    if not booking_series or not _add_exception(booking_series, date, created_by):
+        logger.error(f"Occurrence {booking_series_id = } {date = } not found.")
+        return
+    try:
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to delete booking occurrence: {e}")
@@ -1,19 +1,51 @@
+from collections import defaultdict
+import calendar
+import csv
 import datetime
-from typing import Optional
+import heapq
+import io
+import itertools
+import json
+from typing import Iterator, Optional
 
 from loguru import logger
+from flask import request
 from flask_login import current_user
-from sqlalchemy import desc
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import contains_eager, joinedload, selectinload
 
 from app import db
-from forms.booking_form import BookingForm
+from forms.booking_form import BookingForm, get_time_choices
 from forms.booking_filter_form import BookingFilterForm
+from forms.booking_bulk_form import BookingBulkForm
+from forms.booking_slot_form import BookingSlotForm
 from models.booking import Booking
+from models.booking_audit import BookingAudit
+from models.booking_series import BookingSeries
+from models.booking_series_exception import BookingSeriesException
+from models.service import Service
+from models.user import User
+from services import (
+    booking_event_service,
+    booking_fragment_service,
+    booking_series_service,
+    user_service,
+    workload_service,
+)
 
 booking_date_format = "%Y-%m-%d"
 booking_time_format = "%H:%M:%S"
 booking_datetime_format = f"{booking_date_format} {booking_time_format}"
 
+# Rows fetched per round trip when streaming bookings to CSV.
+booking_csv_batch_size = 500
+
+# Assumed length of a walk when its service has no duration set.
+default_service_duration_minutes = 60
+
+# Longest window a free-slot search may cover, so one request stays cheap.
+max_free_slot_days = 31
+
 
 def get_booking_form(
     booking: Optional[Booking] = None, ignore_request_data: bool = False
@@ -41,19 +73,73 @@ def get_booking_filter_form() -> BookingFilterForm:
     return booking_filter_form
 
 
+def get_booking_slot_form() -> BookingSlotForm:
+    booking_slot_form = BookingSlotForm(request.args)
+    return booking_slot_form
+
+
+def get_booking_bulk_form(ignore_request_data: bool = False) -> BookingBulkForm:
+    if ignore_request_data:
+        booking_bulk_form = BookingBulkForm(formdata=None)
+    else:
+        booking_bulk_form = BookingBulkForm()
+    return booking_bulk_form
+
+
 def get_booking_by_id(booking_id: int) -> Booking:
     booking = db.session.get(Booking, booking_id)
     return booking
 
 
-def get_bookings(
+def get_booking_sort_id(booking: Booking) -> int:
+    # Series occurrences have no row yet, so they sort by their negated
+    # series id, ahead of concrete bookings in the same slot.
+    if booking.booking_id:
+        return booking.booking_id
+    return -booking.booking_series_id
+
+
+def get_booking_sort_key(booking: Booking, descending: bool = True) -> tuple:
+    date_key = booking.date.toordinal()
+    if descending:
+        date_key = -date_key
+    return date_key, booking.time, get_booking_sort_id(booking)
+
+
+def get_booking_cursor(booking: Booking) -> str:
+    date_string = booking.date.strftime(booking_date_format)
+    time_string = booking.time.strftime(booking_time_format)
+    return f"{date_string}_{time_string}_{get_booking_sort_id(booking)}"
+
+
+def parse_booking_cursor(cursor: str) -> tuple:
+    date_string, time_string, booking_id = cursor.split("_")
+    date = datetime.datetime.strptime(date_string, booking_date_format).date()
+    time = datetime.datetime.strptime(time_string, booking_time_format).time()
+    return date, time, int(booking_id)
+
+
+def get_next_booking_cursor(bookings: list[Booking], limit: int) -> Optional[str]:
+    # A full page means there may be more bookings after the last one.
+    if bookings and len(bookings) >= limit:
+        return get_booking_cursor(bookings[-1])
+    return
+
+
+def get_bookings_query(
     user_id: Optional[int] = None,
     customer_id: Optional[int] = None,
     date_min: Optional[str] = None,
     date_max: Optional[str] = None,
-    order_by: Optional[tuple] = (Booking.date.desc(), Booking.time.asc()),
-) -> list[Booking]:
-    query = db.session.query(Booking)
+    descending: bool = True,
+):
+    # Related rows are loaded with one IN query each, which keeps joins out
+    # of the page query so the planner can walk the booking indexes.
+    query = db.session.query(Booking).options(
+        selectinload(Booking.user),
+        selectinload(Booking.customer),
+        selectinload(Booking.service),
+    )
     if user_id and int(user_id) > -1:
         query = query.filter(Booking.user_id == user_id)
     if customer_id and int(customer_id) > -1:
@@ -62,36 +148,253 @@ def get_bookings(
         query = query.filter(Booking.date >= date_min)
     if date_max:
         query = query.filter(Booking.date < date_max)
-    if order_by:
-        query = query.order_by(*order_by)
+    if descending:
+        query = query.order_by(Booking.date.desc())
+    else:
+        query = query.order_by(Booking.date.asc())
+    query = query.order_by(Booking.time.asc(), Booking.booking_id.asc())
+    return query
+
+
+def get_bookings(
+    user_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+    date_min: Optional[str] = None,
+    date_max: Optional[str] = None,
+    descending: bool = True,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    include_series: bool = True,
+) -> list[Booking]:
+    query = get_bookings_query(user_id, customer_id, date_min, date_max, descending)
+
+    # Keyset pagination: continue strictly after the (date, time, booking_id)
+    # of the last booking on the previous page. A malformed cursor raises
+    # ValueError rather than silently restarting at the first page.
+    cursor_date = None
+    cursor_key = None
+    if cursor:
+        cursor_date, cursor_time, cursor_booking_id = parse_booking_cursor(cursor)
+        logger.debug(f"{cursor_date = } {cursor_time = } {cursor_booking_id = }")
+        if descending:
+            date_after_cursor = Booking.date < cursor_date
+            cursor_key = (-cursor_date.toordinal(), cursor_time, cursor_booking_id)
+        else:
+            date_after_cursor = Booking.date > cursor_date
+            cursor_key = (cursor_date.toordinal(), cursor_time, cursor_booking_id)
+        query = query.filter(
+            or_(
+                date_after_cursor,
+                and_(
+                    Booking.date == cursor_date,
+                    or_(
+                        Booking.time > cursor_time,
+                        and_(
+                            Booking.time == cursor_time,
+                            Booking.booking_id > cursor_booking_id,
+                        ),
+                    ),
+                ),
+            )
+        )
+
+    if limit:
+        query = query.limit(limit)
     bookings = query.all()
+
+    # Merge in occurrences expanded from booking series for the same window.
+    if include_series:
+        occurrences = booking_series_service.get_booking_occurrences(
+            user_id=user_id,
+            customer_id=customer_id,
+            date_min=date_min,
+            date_max=date_max,
+            descending=descending,
+            cursor_date=cursor_date,
+        )
+        if cursor_key:
+            occurrences = (
+                occurrence
+                for occurrence in occurrences
+                if get_booking_sort_key(occurrence, descending) > cursor_key
+            )
+        bookings = heapq.merge(
+            bookings,
+            occurrences,
+            key=lambda booking: get_booking_sort_key(booking, descending),
+        )
+        bookings = list(itertools.islice(bookings, limit))
     return bookings
 
 
-def get_past_bookings(
+def get_bookings_version(
     user_id: Optional[int] = None, customer_id: Optional[int] = None, **kwargs
+) -> tuple:
+    """
+    Returns a cheap summary that changes whenever the bookings (or booking
+    series) matching the filters change: the latest change time and row
+    count of each, read in a single aggregate statement.
+    """
+    booking_filters = []
+    booking_series_filters = []
+    if user_id and int(user_id) > -1:
+        booking_filters.append(Booking.user_id == user_id)
+        booking_series_filters.append(BookingSeries.user_id == user_id)
+    if customer_id and int(customer_id) > -1:
+        booking_filters.append(Booking.customer_id == customer_id)
+        booking_series_filters.append(BookingSeries.customer_id == customer_id)
+    booking_changed_at = func.max(func.coalesce(Booking.updated_at, Booking.created_at))
+    booking_series_changed_at = func.max(
+        func.coalesce(BookingSeries.updated_at, BookingSeries.created_at)
+    )
+    version = db.session.query(
+        db.session.query(booking_changed_at)
+        .filter(*booking_filters)
+        .scalar_subquery(),
+        db.session.query(func.count(Booking.booking_id))
+        .filter(*booking_filters)
+        .scalar_subquery(),
+        db.session.query(booking_series_changed_at)
+        .filter(*booking_series_filters)
+        .scalar_subquery(),
+        db.session.query(func.count(BookingSeries.booking_series_id))
+        .filter(*booking_series_filters)
+        .scalar_subquery(),
+        db.session.query(func.count(BookingSeriesException.booking_series_exception_id))
+        .scalar_subquery(),
+    ).one()
+    logger.debug(f"{version = }")
+    return tuple(version)
+
+
+def get_past_bookings(
+    user_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    **kwargs,
 ):
     bookings = get_bookings(
         user_id=user_id,
         customer_id=customer_id,
         date_max=datetime.datetime.now(),
-        order_by=(Booking.date.desc(), Booking.time.asc()),
+        descending=True,
+        cursor=cursor,
+        limit=limit,
     )
     return bookings
 
 
 def get_future_bookings(
-    user_id: Optional[int] = None, customer_id: Optional[int] = None, **kwargs
+    user_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+    **kwargs,
 ):
     bookings = get_bookings(
         user_id=user_id,
         customer_id=customer_id,
         date_min=datetime.datetime.now().date(),
-        order_by=(Booking.date.asc(), Booking.time.asc()),
+        descending=False,
+        cursor=cursor,
+        limit=limit,
     )
     return bookings
 
 
+def get_bookings_csv(
+    period: str = "past",
+    user_id: Optional[int] = None,
+    customer_id: Optional[int] = None,
+    **kwargs,
+) -> Iterator[str]:
+    """
+    Yields the past or future bookings as CSV lines, streaming rows from a
+    server-side cursor so memory stays flat for any range.
+    """
+    if period == "future":
+        date_min, date_max, descending = datetime.datetime.now().date(), None, False
+    else:
+        date_min, date_max, descending = None, datetime.datetime.now(), True
+    query = get_bookings_query(user_id, customer_id, date_min, date_max, descending)
+    query = query.execution_options(yield_per=booking_csv_batch_size)
+    occurrences = booking_series_service.get_booking_occurrences(
+        user_id=user_id,
+        customer_id=customer_id,
+        date_min=date_min,
+        date_max=date_max,
+        descending=descending,
+    )
+    bookings = heapq.merge(
+        query,
+        occurrences,
+        key=lambda booking: get_booking_sort_key(booking, descending),
+    )
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["Date", "Time", "User", "Customer", "Service"])
+    yield buffer.getvalue()
+    for booking in bookings:
+        buffer.seek(0)
+        buffer.truncate(0)
+        writer.writerow(
+            [
+                booking.date,
+                booking.time,
+                booking.user.name if booking.user else "",
+                booking.customer.name,
+                booking.service.name,
+            ]
+        )
+        yield buffer.getvalue()
+
+
+def get_booking_calendar(month: Optional[str] = None, user_id: Optional[int] = None):
+    """
+    Returns the weeks of a month (YYYY-MM, default this month) with the
+    number of bookings per day and per walker, from one GROUP BY query.
+    """
+    if month:
+        month_start = datetime.datetime.strptime(month, "%Y-%m").date()
+    else:
+        month_start = datetime.datetime.now().date().replace(day=1)
+    weeks = calendar.Calendar().monthdatescalendar(month_start.year, month_start.month)
+    date_min = weeks[0][0]
+    date_max = weeks[-1][-1] + datetime.timedelta(days=1)
+
+    day_counts = defaultdict(lambda: {"total": 0, "users": defaultdict(int)})
+    query = (
+        db.session.query(Booking.date, User.name, func.count(Booking.booking_id))
+        .outerjoin(User, Booking.user_id == User.user_id)
+        .filter(Booking.date >= date_min, Booking.date < date_max)
+        .group_by(Booking.date, Booking.user_id, User.name)
+    )
+    if user_id and int(user_id) > -1:
+        query = query.filter(Booking.user_id == user_id)
+    for date, user_name, count in query:
+        day_counts[date]["total"] += count
+        day_counts[date]["users"][user_name] += count
+    occurrences = booking_series_service.get_booking_occurrences(
+        user_id=user_id, date_min=date_min, date_max=date_max
+    )
+    for occurrence in occurrences:
+        user_name = occurrence.user.name if occurrence.user else None
+        day_counts[occurrence.date]["total"] += 1
+        day_counts[occurrence.date]["users"][user_name] += 1
+
+    previous_month = month_start - datetime.timedelta(days=1)
+    next_month = month_start + datetime.timedelta(days=31)
+    booking_calendar = {
+        "month_start": month_start,
+        "previous_month": previous_month.strftime("%Y-%m"),
+        "next_month": next_month.strftime("%Y-%m"),
+        "weeks": [[(date, day_counts.get(date)) for date in week] for week in weeks],
+    }
+    return booking_calendar
+
+
 def get_booking_datetime(booking: Booking):
     datetime_string = " ".join(
         [
@@ -105,20 +408,182 @@ def get_booking_datetime(booking: Booking):
     return booking_datetime
 
 
-def get_repeating_booking_datetimes(booking: Booking, repeating_weeks: int) -> list:
-    booking_datetime = get_booking_datetime(booking)
-    next_booking_datetimes = []
-    for i in range(repeating_weeks):
-        delta_datetime = datetime.timedelta(days=(i + 1) * 7)
-        next_booking_datetime = booking_datetime + delta_datetime
-        next_booking_datetimes.append(next_booking_datetime)
-    logger.debug(f"{next_booking_datetimes = }")
-    return next_booking_datetimes
+def get_booking_interval(
+    date: datetime.date, time: datetime.time, duration: Optional[float]
+) -> tuple[datetime.datetime, datetime.datetime]:
+    start = datetime.datetime.combine(date, time)
+    minutes = duration or default_service_duration_minutes
+    end = start + datetime.timedelta(minutes=float(minutes))
+    return start, end
+
+
+def get_booking_conflicts(
+    user_id: int,
+    dates: list[datetime.date],
+    time,
+    service_id: int,
+    exclude_booking_id: Optional[int] = None,
+) -> list[Booking]:
+    """
+    Returns the walker's bookings that overlap a new booking at `time` on any
+    of `dates`, using each service's duration.
+
+    Only the walker's bookings on those dates are read, through the
+    (user_id, date) index, together with any series occurrences on them.
+    """
+    if not user_id or not dates:
+        return []
+    if isinstance(time, str):
+        time = datetime.datetime.strptime(time, booking_time_format).time()
+    service = db.session.get(Service, service_id)
+    duration = service.duration if service else None
+
+    query = (
+        db.session.query(Booking)
+        .join(Booking.service)
+        .options(contains_eager(Booking.service), joinedload(Booking.customer))
+        .filter(Booking.user_id == user_id, Booking.date.in_(dates))
+    )
+    if exclude_booking_id:
+        query = query.filter(Booking.booking_id != exclude_booking_id)
+    candidates = query.all()
+    occurrences = booking_series_service.get_booking_occurrences(
+        user_id=user_id,
+        date_min=min(dates),
+        date_max=max(dates) + datetime.timedelta(days=1),
+    )
+    candidates += [occurrence for occurrence in occurrences]
+
+    conflicts = []
+    for booking in candidates:
+        if booking.date not in dates:
+            continue
+        start, end = get_booking_interval(booking.date, time, duration)
+        other_start, other_end = get_booking_interval(
+            booking.date, booking.time, booking.service.duration
+        )
+        if start < other_end and other_start < end:
+            conflicts.append(booking)
+    logger.debug(f"{conflicts = }")
+    return conflicts
+
+
+def get_free_slots(
+    service_id: int,
+    date_min: datetime.date,
+    date_max: datetime.date,
+    user_id: Optional[int] = None,
+) -> list[dict]:
+    """
+    Returns the free start times per walker and day between `date_min` and
+    `date_max` (inclusive) for a booking of the given service.
+
+    Every booking in the window is fetched in one query, then each walker's
+    day is swept once against the sorted candidate start times.
+
+    Raises ValueError when the window is reversed or longer than
+    `max_free_slot_days`.
+    """
+    days = (date_max - date_min).days + 1
+    if days < 1 or days > max_free_slot_days:
+        raise ValueError(
+            f"Expected a window of 1 to {max_free_slot_days} days, got {days}"
+        )
+    service = db.session.get(Service, service_id)
+    duration = service.duration if service else None
+    if user_id and int(user_id) > -1:
+        users = [user_service.get_user_by_id(int(user_id))]
+    else:
+        users = user_service.get_users(is_active=True)
+    user_ids = [user.user_id for user in users]
+    slot_times = [
+        datetime.datetime.strptime(value, booking_time_format).time()
+        for value, _ in get_time_choices(start_hour=8, end_hour=18, interval_minutes=15)
+    ]
+
+    # Busy intervals per (walker, day).
+    busy_intervals = defaultdict(list)
+    query = (
+        db.session.query(Booking.user_id, Booking.date, Booking.time, Service.duration)
+        .join(Service, Booking.service_id == Service.service_id)
+        .filter(
+            Booking.user_id.in_(user_ids),
+            Booking.date >= date_min,
+            Booking.date <= date_max,
+        )
+    )
+    for booking_user_id, date, time, booking_duration in query:
+        interval = get_booking_interval(date, time, booking_duration)
+        busy_intervals[(booking_user_id, date)].append(interval)
+    occurrences = booking_series_service.get_booking_occurrences(
+        user_id=user_id,
+        date_min=date_min,
+        date_max=date_max + datetime.timedelta(days=1),
+    )
+    for occurrence in occurrences:
+        interval = get_booking_interval(
+            occurrence.date, occurrence.time, occurrence.service.duration
+        )
+        busy_intervals[(occurrence.user_id, occurrence.date)].append(interval)
+
+    free_slots = []
+    date = date_min
+    while date <= date_max:
+        for user in users:
+            intervals = sorted(busy_intervals[(user.user_id, date)])
+            i = 0
+            times = []
+            for slot_time in slot_times:
+                start, end = get_booking_interval(date, slot_time, duration)
+                # Intervals that end before this slot also end before every
+                # later slot, so the sweep never moves backwards.
+                while i < len(intervals) and intervals[i][1] <= start:
+                    i += 1
+                if i < len(intervals) and intervals[i][0] < end:
+                    continue
+                times.append(slot_time)
+            if times:
+                free_slots.append({"date": date, "user": user, "times": times})
+        date += datetime.timedelta(days=1)
+    return free_slots
+
+
+def get_booking_conflict_errors(
+    booking_data: dict, exclude_booking_id: Optional[int] = None
+) -> list[str]:
+    date = booking_data.get("date")
+    repeating_weeks = booking_data.get("repeating_weeks") or 0
+    dates = [date + datetime.timedelta(weeks=week) for week in range(repeating_weeks + 1)]
+    conflicts = get_booking_conflicts(
+        user_id=booking_data.get("user_id"),
+        dates=dates,
+        time=booking_data.get("time"),
+        service_id=booking_data.get("service_id"),
+        exclude_booking_id=exclude_booking_id,
+    )
+    errors = [get_booking_conflict_error(booking) for booking in conflicts]
+    return errors
+
+
+def get_booking_conflict_error(booking: Booking) -> str:
+    return (
+        f"Overlaps {booking.customer.name} ({booking.service.name}) on "
+        f"{booking.date} at {booking.time.strftime('%I:%M %p')}"
+    )
 
 
 def add_booking(booking_data: dict) -> list[Booking]:
     if booking_data.get("repeating_weeks", 0) > 0:
-        bookings = add_repeat_bookings(booking_data=booking_data)
+        booking_series = booking_series_service.add_booking_series(
+            booking_data=booking_data
+        )
+        if not booking_series:
+            return []
+        bookings = [
+            booking_series_service.get_booking_occurrence(
+                booking_series, booking_series.date_start
+            )
+        ]
     else:
         booking = add_single_booking(booking_data=booking_data)
         bookings = [booking]
@@ -150,29 +615,6 @@ def add_single_booking(booking_data: dict) -> Optional[Booking]:
         return
 
 
-def add_repeat_bookings(booking_data: dict) -> list[Booking]:
-    booking = add_single_booking(booking_data=booking_data)
-    if not booking:
-        return []
-    bookings = [booking]
-    logger.debug(f"{bookings = }")
-    repeating_weeks = booking_data.get("repeating_weeks")
-    logger.debug(f"{repeating_weeks = }")
-    if repeating_weeks > 0:
-        datetimes = get_repeating_booking_datetimes(booking, repeating_weeks)
-        logger.debug(f"{datetimes = }")
-        for datetime in datetimes:
-            logger.debug(f"{datetime = }")
-            repeat_booking_data = booking_data.copy()
-            repeat_booking_data["date"] = f"{datetime.date()}"
-            repeat_booking_data["time"] = f"{datetime.time()}"
-            repeat_booking = add_single_booking(repeat_booking_data)
-            if repeat_booking:
-                bookings.append(repeat_booking)
-    logger.debug(f"{bookings = }")
-    return bookings
-
-
 def update_booking_by_id(booking_id: int, booking_data: dict) -> Optional[Booking]:
     logger.debug(f"{booking_id = } {booking_data = }")
     booking = get_booking_by_id(booking_id)
@@ -228,3 +670,180 @@ def delete_booking_by_id(booking_id: int) -> None:
             logger.error(f"Failed to delete booking: {e}")
     else:
         logger.error(f"Booking with ID {booking_id} does not exist")
+
+
+def get_bulk_booking_filters(bulk_data: dict) -> list:
+    # Only unbilled bookings are shifted or deleted.
+    filters = [
+        Booking.date >= bulk_data.get("date_min"),
+        Booking.date <= bulk_data.get("date_max"),
+    ]
+    if (user_id := bulk_data.get("user_id")) and int(user_id) > -1:
+        filters.append(Booking.user_id == user_id)
+    if (customer_id := bulk_data.get("customer_id")) and int(customer_id) > -1:
+        filters.append(Booking.customer_id == customer_id)
+    if bulk_data.get("action") in ("shift", "delete"):
+        filters.append(Booking.invoice_id.is_(None))
+    return filters
+
+
+def get_bulk_bookings(bulk_data: dict) -> list[Booking]:
+    """Returns the bookings and series occurrences a bulk change would touch."""
+    query = db.session.query(Booking).options(
+        joinedload(Booking.user),
+        joinedload(Booking.customer),
+        joinedload(Booking.service),
+    )
+    bookings = query.filter(*get_bulk_booking_filters(bulk_data)).all()
+    occurrences = booking_series_service.get_booking_occurrences(
+        user_id=bulk_data.get("user_id"),
+        customer_id=bulk_data.get("customer_id"),
+        date_min=bulk_data.get("date_min"),
+        date_max=bulk_data.get("date_max") + datetime.timedelta(days=1),
+    )
+    return bookings + list(occurrences)
+
+
+def get_bulk_booking_conflict_errors(bulk_data: dict) -> list[str]:
+    """
+    Returns the overlaps a reassign or shift would create: against the
+    walker's other bookings at the new date or time, and, when reassigning,
+    between the changed bookings now walked by the same walker.
+    """
+    action = bulk_data.get("action")
+    if action not in ("reassign", "shift"):
+        return []
+    bookings = get_bulk_bookings(bulk_data)
+    changed = {(get_booking_sort_id(booking), booking.date) for booking in bookings}
+    days = datetime.timedelta(days=bulk_data.get("days") or 0)
+
+    moved_bookings = []
+    moved_dates = defaultdict(list)
+    for booking in bookings:
+        if action == "reassign":
+            user_id, date = bulk_data.get("new_user_id"), booking.date
+        else:
+            user_id, date = booking.user_id, booking.date + days
+        if not user_id:
+            continue
+        moved_bookings.append((user_id, date, booking))
+        moved_dates[(user_id, booking.time, booking.service_id)].append(date)
+
+    # One conflict read per walker, time and service rather than per booking.
+    errors = []
+    for (user_id, time, service_id), dates in moved_dates.items():
+        conflicts = get_booking_conflicts(user_id, dates, time, service_id)
+        errors += [
+            get_booking_conflict_error(conflict)
+            for conflict in conflicts
+            if (get_booking_sort_id(conflict), conflict.date) not in changed
+        ]
+    if action == "reassign":
+        # Changed bookings now walked by the same walker must not overlap.
+        moved_bookings.sort(key=lambda moved: (moved[0], moved[1], moved[2].time))
+        latest_ends = {}
+        for user_id, date, booking in moved_bookings:
+            start, end = get_booking_interval(
+                date, booking.time, booking.service.duration
+            )
+            latest_end, latest_booking = latest_ends.get((user_id, date), (None, None))
+            if latest_end and start < latest_end:
+                errors.append(get_booking_conflict_error(latest_booking))
+            if not latest_end or end > latest_end:
+                latest_ends[(user_id, date)] = (end, booking)
+    logger.debug(f"{errors = }")
+    return errors
+
+
+def bulk_update_bookings(bulk_data: dict, updated_by: int) -> Optional[int]:
+    """
+    Reassigns, shifts or deletes every booking matching a filter (walker,
+    customer, inclusive date range) in one transaction, and records a single
+    BookingAudit row. Series occurrences in the range are made concrete in
+    the same transaction so they change with the rest. Only unbilled
+    bookings are shifted or deleted. Returns the number of affected bookings.
+    """
+    action = bulk_data.get("action")
+    if action not in ("reassign", "shift", "delete"):
+        logger.error(f"Unknown bulk booking {action = }")
+        return
+    filters = get_bulk_booking_filters(bulk_data)
+    changes = {"updated_at": datetime.datetime.now(), "updated_by": updated_by}
+    parameters = {
+        key: bulk_data.get(key)
+        for key in (
+            "user_id",
+            "customer_id",
+            "date_min",
+            "date_max",
+            "new_user_id",
+            "days",
+        )
+    }
+    try:
+        booking_series_service.add_booking_occurrences(
+            user_id=bulk_data.get("user_id"),
+            customer_id=bulk_data.get("customer_id"),
+            date_min=bulk_data.get("date_min"),
+            date_max=bulk_data.get("date_max") + datetime.timedelta(days=1),
+            created_by=updated_by,
+        )
+        db.session.flush()
+        if action == "reassign":
+            changes["user_id"] = bulk_data.get("new_user_id")
+            statement = update(Booking).where(*filters).values(**changes)
+            result = db.session.execute(
+                statement.returning(Booking.booking_id),
+                execution_options={"synchronize_session": False},
+            )
+            booking_ids = [row.booking_id for row in result]
+        elif action == "shift":
+            # New dates are computed here, as date arithmetic in SQL differs
+            # between dialects, and written back as one bulk UPDATE by id.
+            days = datetime.timedelta(days=bulk_data.get("days"))
+            bookings = db.session.execute(
+                select(Booking.booking_id, Booking.date).where(*filters)
+            ).all()
+            booking_ids = [booking.booking_id for booking in bookings]
+            if bookings:
+                db.session.execute(
+                    update(Booking),
+                    [
+                        {"booking_id": booking_id, "date": date + days} | changes
+                        for booking_id, date in bookings
+                    ],
+                    execution_options={"synchronize_session": False},
+                )
+        else:
+            statement = delete(Booking).where(*filters)
+            result = db.session.execute(
+                statement.returning(Booking.booking_id),
+                execution_options={"synchronize_session": False},
+            )
+            booking_ids = [row.booking_id for row in result]
+        date_min, date_max = bulk_data.get("date_min"), bulk_data.get("date_max")
+        if action == "shift":
+            date_min = min(date_min, date_min + days)
+            date_max = max(date_max, date_max + days)
+        workload_service.refresh_workload(db.session, date_min, date_max)
+        booking_audit = BookingAudit(
+            action=action,
+            parameters=json.dumps(parameters, default=str),
+            affected_count=len(booking_ids),
+            created_by=updated_by,
+        )
+        db.session.add(booking_audit)
+        # Statements bypass the flush hooks, so notify live boards here.
+        kind = "deleted" if action == "delete" else "updated"
+        booking_event_service.publish(
+            [(kind, booking_id) for booking_id in booking_ids]
+        )
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"Error bulk updating bookings: {e}")
+        db.session.rollback()
+        return
+    logger.debug(f"{action = } {booking_ids = }")
+
+    booking_fragment_service.invalidate_booking_rows(set(booking_ids))
+    return len(booking_ids)
@@ -6,7 +6,20 @@ from sqlalchemy.sql import text
 
 from app import db
 
-tables = ["user", "customer", "vet", "dog", "service", "booking", "expense", "invoice"]
+tables = [
+    "user",
+    "customer",
+    "vet",
+    "dog",
+    "service",
+    "booking",
+    "booking_series",
+    "booking_series_exception",
+    "user_workload",
+    "expense",
+    "invoice",
+    "invoice_line",
+]
 
 
 def wake_up_database(max_attempts=5, initial_delay=1, max_delay=30):
@@ -3,6 +3,7 @@ from typing import Optional
 
 from loguru import logger
 from sqlalchemy import asc, desc, func
+from sqlalchemy.orm import joinedload
 
 from app import db
 from forms.dog_form import DogForm
@@ -34,7 +35,9 @@ def get_dog_form(
 
 def get_dogs() -> list:
     # Generate query
-    query = db.session.query(Dog).order_by(Dog.name.desc())
+    query = db.session.query(Dog)
+    query = query.options(joinedload(Dog.customer), joinedload(Dog.vet))
+    query = query.order_by(Dog.name.desc())
     dogs = query.all()
     logger.debug(f"{dogs = }")
     return dogs
@@ -0,0 +1,82 @@
+import hashlib
+import json
+from typing import Iterable, Iterator, Optional
+
+from loguru import logger
+from sqlalchemy import delete
+
+from app import db
+from models.invoice import Invoice
+from models.invoice_line import InvoiceLine
+from models.invoice_pdf import InvoicePdf
+from services import invoice_download_service
+
+invoice_line_batch_size = 500
+
+
+def get_invoice_lines(invoice: Invoice) -> Iterator[tuple]:
+    """
+    Yields (date, time, service name, price) of each invoice line in date
+    order, streamed from a server-side cursor in batches.
+    """
+    query = (
+        db.session.query(
+            InvoiceLine.date,
+            InvoiceLine.time,
+            InvoiceLine.service_name,
+            InvoiceLine.price,
+        )
+        .filter(InvoiceLine.invoice_id == invoice.invoice_id)
+        .order_by(InvoiceLine.date, InvoiceLine.time, InvoiceLine.invoice_line_id)
+        .execution_options(yield_per=invoice_line_batch_size)
+    )
+    for line in query:
+        yield tuple(line)
+
+
+def get_invoice_hash(invoice: Invoice, lines: Optional[Iterable[tuple]] = None) -> str:
+    """Hashes the invoice fields, booking lines and template the PDF is built from."""
+    if lines is None:
+        lines = get_invoice_lines(invoice)
+    content = [
+        invoice_download_service.template_version,
+        invoice.reference,
+        invoice.date_issued,
+        invoice.date_due,
+        invoice.price_subtotal,
+        invoice.price_discount,
+        invoice.price_total,
+        invoice.customer.name,
+    ]
+    invoice_hash = hashlib.sha256(json.dumps(content, default=str).encode("UTF-8"))
+    for line in lines:
+        invoice_hash.update(json.dumps(line, default=str).encode("UTF-8"))
+    return invoice_hash.hexdigest()
+
+
+def get_invoice_pdf(content_hash: str) -> Optional[bytes]:
+    data = (
+        db.session.query(InvoicePdf.data)
+        .filter(InvoicePdf.content_hash == content_hash)
+        .scalar()
+    )
+    return data
+
+
+def add_invoice_pdf(invoice: Invoice, content_hash: str, data: bytes) -> None:
+    # Only the latest render of an invoice is kept.
+    try:
+        invalidate_invoice_pdfs(invoice.invoice_id)
+        invoice_pdf = InvoicePdf(
+            content_hash=content_hash, invoice_id=invoice.invoice_id, data=data
+        )
+        db.session.add(invoice_pdf)
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"Error caching invoice pdf: {e}")
+        db.session.rollback()
+
+
+def invalidate_invoice_pdfs(invoice_id: int) -> None:
+    """Drops cached renders of an invoice; commits with the caller's transaction."""
+    db.session.execute(delete(InvoicePdf).where(InvoicePdf.invoice_id == invoice_id))
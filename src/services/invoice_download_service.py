@@ -1,8 +1,10 @@
 from datetime import datetime
 from io import BytesIO
+import itertools
 import sys
 import tempfile
-from typing import Dict
+from types import SimpleNamespace
+from typing import Dict, Iterable, Iterator, Optional
 
 from loguru import logger
 from PIL import Image
@@ -40,25 +42,45 @@ theme_color_2 = "#f4e2cc"
 theme_color_3 = "#8bb4a6"
 theme_font_1 = ""
 
+# Bump whenever the rendered layout changes so cached PDFs are not reused.
+template_version = 2
 
-def _add_header(pdf, invoice, width, height):
+
+_logo = None
+
+logo_width = 150
+logo_aspect_ratio = 1.1
+logo_height = logo_aspect_ratio * logo_width
+
+# Pixels per point of the embedded logo, about 216 dpi at its printed size.
+logo_resolution = 3
+
+header_form_name = "invoice_header"
+
+
+def get_logo() -> ImageReader:
+    # Decoded and downscaled once per process; drawImage then embeds it once
+    # per document.
+    global _logo
+    if _logo is None:
+        image = Image.open(server_logo).convert("RGB")
+        image.thumbnail(
+            (logo_width * logo_resolution, logo_height * logo_resolution),
+            Image.LANCZOS,
+        )
+        _logo = ImageReader(image)
+    return _logo
+
+
+def _draw_header(pdf, invoice, width, height):
     # Invoice logo
-    logo_width = 150
-    logo_aspect_ratio = 1.1
-    logo_height = logo_aspect_ratio * logo_width
-    w, h = pdf.drawInlineImage(
-        server_logo,
+    pdf.drawImage(
+        get_logo(),
         x_0,
         y_0,
         width=logo_width,
         height=logo_height,
     )
-    pdf.linkURL(
-        server_url,
-        (x_0, y_0, x_0 + w, y_0 + h),
-        thickness=0,
-        relative=1,
-    )
 
     # Invoice title
     pdf.setFont("Helvetica-Bold", 20)
@@ -84,12 +106,22 @@ def _add_header(pdf, invoice, width, height):
     y -= medium_skip
     text = "Need help? "
     pdf.drawString(x, y, text)
-    w = pdf.stringWidth(text)
-    x += w
-    text = server_email
-    pdf.drawString(x, y, text)
-    w = pdf.stringWidth(text)
-    h = pdf._leading
+    x += pdf.stringWidth(text)
+    pdf.drawString(x, y, server_email)
+
+
+def _add_header_links(pdf, invoice, width, height):
+    # Links are page annotations, so unlike the header form they go on each page.
+    pdf.linkURL(
+        server_url,
+        (x_0, y_0, x_0 + logo_width, y_0 + logo_height),
+        thickness=0,
+        relative=1,
+    )
+    x = x_0 + 4.25 * inch + pdf.stringWidth("Need help? ", "Helvetica", 12)
+    y = 0.9 * height - 2 * medium_skip - 2 * small_skip
+    w = pdf.stringWidth(server_email, "Helvetica", 12)
+    h = 1.2 * 12
     text = f"mailto:{server_email}?subject=Invoice #{invoice.reference}"
     pdf.linkURL(
         text,
@@ -97,8 +129,19 @@ def _add_header(pdf, invoice, width, height):
         thickness=0,
         relative=1,
     )
+
+
+def _add_header(pdf, invoice, width, height):
+    # The header is the same on every page, so it is drawn into a form once
+    # per document and each page only references it.
+    if not pdf.hasForm(header_form_name):
+        pdf.beginForm(header_form_name)
+        _draw_header(pdf, invoice, width, height)
+        pdf.endForm()
+    pdf.doForm(header_form_name)
+    _add_header_links(pdf, invoice, width, height)
     x = x_0 + medium_skip
-    y -= big_skip
+    y = 0.9 * height - 2 * medium_skip - 2 * small_skip - big_skip
     return x, y
 
 
@@ -108,7 +151,7 @@ def _add_page_break(pdf, invoice, width, height):
     return x, y
 
 
-def _create(invoice):
+def _create(invoice, lines: Optional[Iterable[tuple]] = None):
     # Create document
     buffer = BytesIO()
     pdf = canvas.Canvas(buffer, pagesize=letter)
@@ -122,39 +165,44 @@ def _create(invoice):
     text = f"Bill To: {invoice.customer.name}"
     pdf.drawString(x, y, text)
 
-    # Table of booking
-    booking_chunks = chunk_bookings(invoice.bookings)
-    logger.debug(f"{booking_chunks = }")
-    number_of_chunks = len(booking_chunks)
-    for i, bookings in enumerate(booking_chunks):
-        table_header = ["Date", "Service", f"Price / {currency}"]
-        table_style = TableStyle(
-            [
-                ("BACKGROUND", (0, 0), (-1, 0), theme_color_1),
-                ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
-                ("ALIGN", (0, 0), (-1, 0), "CENTER"),
-                ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
-                ("FONTSIZE", (0, 0), (-1, 0), 12),
-                ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
-                ("BACKGROUND", (0, 1), (-1, -1), theme_color_2),
-                ("TEXTCOLOR", (0, 1), (-1, -1), colors.black),
-                ("ALIGN", (0, 1), (-1, -1), "CENTER"),
-                ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
-                ("FONTSIZE", (0, 1), (-1, -1), 11),
-                ("RIGHTPADDING", (2, 1), (2, -1), 5),
-                ("RIGHTPADDING", (3, 1), (3, -1), 5),
-                ("RIGHTPADDING", (4, 1), (4, -1), 5),
-            ]
+    # Table of booking, built a page at a time from (date, time, service name,
+    # price) lines so only one page of bookings is held at once. Memory is not
+    # flat: the canvas keeps every finished page, 10-15 KB each, until save()
+    # writes the cross-reference table, and the PDF itself is built in memory.
+    if lines is None:
+        lines = (
+            (line.date, line.time, line.service_name, line.price)
+            for line in invoice.lines
         )
+    table_header = ["Date", "Service", f"Price / {currency}"]
+    table_style = TableStyle(
+        [
+            ("BACKGROUND", (0, 0), (-1, 0), theme_color_1),
+            ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+            ("ALIGN", (0, 0), (-1, 0), "CENTER"),
+            ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+            ("FONTSIZE", (0, 0), (-1, 0), 12),
+            ("BOTTOMPADDING", (0, 0), (-1, 0), 12),
+            ("BACKGROUND", (0, 1), (-1, -1), theme_color_2),
+            ("TEXTCOLOR", (0, 1), (-1, -1), colors.black),
+            ("ALIGN", (0, 1), (-1, -1), "CENTER"),
+            ("FONTNAME", (0, 1), (-1, -1), "Helvetica"),
+            ("FONTSIZE", (0, 1), (-1, -1), 11),
+            ("RIGHTPADDING", (2, 1), (2, -1), 5),
+            ("RIGHTPADDING", (3, 1), (3, -1), 5),
+            ("RIGHTPADDING", (4, 1), (4, -1), 5),
+        ]
+    )
+    booking_chunks = _mark_last(chunk_bookings(lines))
+    for i, (bookings, is_last_chunk) in enumerate(booking_chunks):
         table_data = [table_header]
-        for booking in bookings:
-            booking_date = booking.date
-            booking_time = booking.time.strftime("%I:%M %p")
+        for booking_date, booking_time, service_name, service_price in bookings:
+            booking_time = booking_time.strftime("%I:%M %p")
             table_data.append(
                 [
                     f"{booking_date} {booking_time}",
-                    booking.service.name,
-                    f"{booking.service.price:.2f}",
+                    service_name,
+                    f"{service_price:.2f}",
                 ]
             )
         table = Table(table_data, colWidths=[2.16 * inch, 2.16 * inch, 2.16 * inch])
@@ -168,7 +216,7 @@ def _create(invoice):
         y -= h
         table.drawOn(pdf, x, y)
         # Add the subtotal and total on the last chunk of services.
-        if i == number_of_chunks - 1:
+        if is_last_chunk:
             pdf.setFillColor(colors.black)
             x -= 0.75 * inch
             x += 4.8 * inch
@@ -264,43 +312,76 @@ def _create(invoice):
 
     # Save and create PDF file and filename
     pdf.save()
-    pdf_bytes = buffer.getvalue()
-    buffer.close()
-    pdf_file = BytesIO()
-    pdf_file.write(pdf_bytes)
-    pdf_file.seek(0)
+    buffer.seek(0)
+    pdf_filepath = get_filename(invoice)
+
+    return buffer, pdf_filepath
+
+
+def get_filename(invoice) -> str:
     customer_name = invoice.customer.name
     year_issued = invoice.date_issued.strftime("%Y")
     month_issued = invoice.date_issued.strftime("%B")
-    pdf_filepath = f"{customer_name} {year_issued} {month_issued}.pdf"
-
-    return pdf_file, pdf_filepath
+    return f"{customer_name} {year_issued} {month_issued}.pdf"
 
 
-def chunk_bookings(bookings: list) -> list:
+def chunk_bookings(bookings: Iterable) -> Iterator[list]:
+    """Yields the bookings of each page, consuming `bookings` lazily."""
     maximum_number_of_services_on_first_page = 21
     maximum_number_of_services_for_aggregate = 0
     maximum_number_of_services_on_page = (
         maximum_number_of_services_on_first_page
         + maximum_number_of_services_for_aggregate
     )
-    service_chunks = []
-    page_number = 0
-    while len(bookings) > 0:
-        page_number += 1
-        number_of_services_remaining = len(bookings)
-        if page_number == 1:
-            number_of_services_on_page = maximum_number_of_services_on_first_page
-        else:
-            if number_of_services_remaining > maximum_number_of_services_on_page:
-                number_of_services_on_page = maximum_number_of_services_on_page
-            else:
-                number_of_services_on_page = number_of_services_remaining
-        service_chunks.append(bookings[:number_of_services_on_page])
-        bookings = bookings[number_of_services_on_page:]
-    return service_chunks
+    bookings = iter(bookings)
+    number_of_services_on_page = maximum_number_of_services_on_first_page
+    while service_chunk := list(itertools.islice(bookings, number_of_services_on_page)):
+        yield service_chunk
+        number_of_services_on_page = maximum_number_of_services_on_page
+
+
+def _mark_last(items: Iterator) -> Iterator[tuple]:
+    # Pairs each item with whether it is the last, looking one item ahead.
+    item = next(items, None)
+    while item is not None:
+        next_item = next(items, None)
+        yield item, next_item is None
+        item = next_item
 
 
-def create(invoice):
-    pdf_file, pdf_filepath = _create(invoice)
+def create(invoice, lines: Optional[Iterable[tuple]] = None):
+    pdf_file, pdf_filepath = _create(invoice, lines)
     return pdf_file, pdf_filepath
+
+
+def get_invoice_data(invoice, lines: list) -> dict:
+    """
+    Snapshots what the PDF shows as plain values, so it can be rendered in a
+    worker process. `lines` are (date, time, service name, price) rows.
+    """
+    invoice_data = {
+        "reference": invoice.reference,
+        "date_issued": invoice.date_issued,
+        "date_due": invoice.date_due,
+        "price_subtotal": invoice.price_subtotal,
+        "price_discount": invoice.price_discount,
+        "price_total": invoice.price_total,
+        "customer_name": invoice.customer.name,
+        "lines": [tuple(line) for line in lines],
+    }
+    return invoice_data
+
+
+def render(invoice_data: dict) -> bytes:
+    """Renders a snapshot from get_invoice_data to PDF bytes."""
+    invoice = SimpleNamespace(
+        reference=invoice_data["reference"],
+        date_issued=invoice_data["date_issued"],
+        date_due=invoice_data["date_due"],
+        price_subtotal=invoice_data["price_subtotal"],
+        price_discount=invoice_data["price_discount"],
+        price_total=invoice_data["price_total"],
+        customer=SimpleNamespace(name=invoice_data["customer_name"]),
+    )
+    pdf_file, _ = _create(invoice, invoice_data["lines"])
+    return pdf_file.getvalue()
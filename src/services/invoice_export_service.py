@@ -0,0 +1,112 @@
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+import datetime
+import io
+import os
+from typing import Iterator
+import zipfile
+
+from loguru import logger
+from sqlalchemy.orm import joinedload
+
+from app import db
+from models.invoice import Invoice
+from services import invoice_cache_service, invoice_download_service
+
+# Renders in flight at once, which bounds the memory an export holds.
+max_render_workers = 4
+
+_render_pool = None
+
+
+class ZipStream(io.RawIOBase):
+    """Unseekable sink for zipfile that hands back what was written so far."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def get_render_pool() -> ProcessPoolExecutor:
+    global _render_pool
+    if _render_pool is None:
+        max_workers = min(max_render_workers, os.cpu_count() or 1)
+        _render_pool = ProcessPoolExecutor(max_workers=max_workers)
+    return _render_pool
+
+
+def _submit_render(invoice_data: dict) -> Future:
+    try:
+        render_pool = get_render_pool()
+        return render_pool.submit(invoice_download_service.render, invoice_data)
+    except (NotImplementedError, OSError) as e:
+        # Some serverless runtimes have no multiprocessing primitives.
+        logger.error(f"Rendering invoice in process: {e}")
+        future = Future()
+        future.set_result(invoice_download_service.render(invoice_data))
+        return future
+
+
+def get_invoices(date_min: datetime.date, date_max: datetime.date) -> list[Invoice]:
+    query = db.session.query(Invoice).options(joinedload(Invoice.customer))
+    query = query.filter(Invoice.date_issued >= date_min)
+    query = query.filter(Invoice.date_issued <= date_max)
+    query = query.order_by(Invoice.date_issued, Invoice.invoice_id)
+    invoices = query.all()
+    return invoices
+
+
+def get_invoice_pdfs(invoices: list[Invoice]) -> Iterator[tuple[str, bytes]]:
+    """
+    Yields (filename, pdf bytes) per invoice as each becomes ready. Cached
+    PDFs are yielded straight away; the rest are rendered across the pool,
+    with at most `max_render_workers` renders pending at a time.
+    """
+    pending = {}
+
+    def _completed():
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            invoice, content_hash, filename = pending.pop(future)
+            pdf_bytes = future.result()
+            invoice_cache_service.add_invoice_pdf(invoice, content_hash, pdf_bytes)
+            yield filename, pdf_bytes
+
+    for invoice in invoices:
+        filename = invoice_download_service.get_filename(invoice)
+        filename = f"{invoice.reference} {filename}"
+        lines = list(invoice_cache_service.get_invoice_lines(invoice))
+        content_hash = invoice_cache_service.get_invoice_hash(invoice, lines)
+        if pdf_bytes := invoice_cache_service.get_invoice_pdf(content_hash):
+            yield filename, pdf_bytes
+            continue
+        if len(pending) >= max_render_workers:
+            yield from _completed()
+        invoice_data = invoice_download_service.get_invoice_data(invoice, lines)
+        pending[_submit_render(invoice_data)] = (invoice, content_hash, filename)
+    while pending:
+        yield from _completed()
+
+
+def get_invoices_zip(
+    date_min: datetime.date, date_max: datetime.date
+) -> Iterator[bytes]:
+    """Streams a ZIP of the PDFs of invoices issued in [date_min, date_max]."""
+    invoices = get_invoices(date_min, date_max)
+    logger.debug(f"Exporting {len(invoices)} invoices")
+    zip_stream = ZipStream()
+    with zipfile.ZipFile(zip_stream, "w", zipfile.ZIP_STORED) as zip_file:
+        for filename, pdf_bytes in get_invoice_pdfs(invoices):
+            zip_file.writestr(filename, pdf_bytes)
+            yield zip_stream.drain()
+    yield zip_stream.drain()
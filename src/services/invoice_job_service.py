@@ -0,0 +1,167 @@
+from concurrent.futures import ThreadPoolExecutor
+import datetime
+from typing import Optional
+
+from flask import current_app
+from loguru import logger
+from sqlalchemy import update
+
+from app import db
+from models.invoice import Invoice
+from models.invoice_render_job import InvoiceRenderJob
+from services import invoice_cache_service, invoice_download_service
+
+max_render_jobs = 2
+
+# Queued or running jobs untouched for this long were lost, e.g. to a restart.
+stale_render_job_seconds = 60
+
+_job_pool = None
+
+
+def get_job_pool() -> ThreadPoolExecutor:
+    global _job_pool
+    if _job_pool is None:
+        _job_pool = ThreadPoolExecutor(
+            max_workers=max_render_jobs, thread_name_prefix="invoice-render"
+        )
+    return _job_pool
+
+
+def get_invoice_render_job_by_id(
+    invoice_render_job_id: int,
+) -> Optional[InvoiceRenderJob]:
+    invoice_render_job = db.session.get(InvoiceRenderJob, invoice_render_job_id)
+    logger.debug(f"{invoice_render_job = }")
+    return invoice_render_job
+
+
+def add_invoice_render_job(
+    invoice_id: int, created_by: Optional[int] = None
+) -> Optional[InvoiceRenderJob]:
+    """Queues a PDF render of an invoice, reusing a job already in progress."""
+    invoice_render_job = (
+        db.session.query(InvoiceRenderJob)
+        .filter(
+            InvoiceRenderJob.invoice_id == invoice_id,
+            InvoiceRenderJob.status.in_(("pending", "running")),
+        )
+        .order_by(InvoiceRenderJob.invoice_render_job_id.desc())
+        .first()
+    )
+    if invoice_render_job:
+        resume_invoice_render_job(invoice_render_job)
+        return invoice_render_job
+
+    now = datetime.datetime.utcnow()
+    invoice_render_job = InvoiceRenderJob(
+        invoice_id=invoice_id,
+        status="pending",
+        created_at=now,
+        created_by=created_by,
+        updated_at=now,
+    )
+    try:
+        db.session.add(invoice_render_job)
+        db.session.commit()
+        logger.debug(f"{invoice_render_job = }")
+    except Exception as e:
+        logger.error(f"Error adding invoice render job: {e}")
+        db.session.rollback()
+        return
+    _submit(invoice_render_job.invoice_render_job_id)
+    return invoice_render_job
+
+
+def resume_invoice_render_job(invoice_render_job: InvoiceRenderJob) -> None:
+    """Requeues a job whose worker went away before finishing it."""
+    if invoice_render_job.status not in ("pending", "running"):
+        return
+    stale_at = datetime.datetime.utcnow() - datetime.timedelta(
+        seconds=stale_render_job_seconds
+    )
+    if invoice_render_job.updated_at and invoice_render_job.updated_at > stale_at:
+        return
+    job_id = invoice_render_job.invoice_render_job_id
+    result = db.session.execute(
+        update(InvoiceRenderJob)
+        .where(
+            InvoiceRenderJob.invoice_render_job_id == job_id,
+            InvoiceRenderJob.updated_at == invoice_render_job.updated_at,
+        )
+        .values(status="pending", updated_at=datetime.datetime.utcnow())
+    )
+    db.session.commit()
+    db.session.refresh(invoice_render_job)
+    if result.rowcount:
+        logger.info(f"Resuming stale invoice render job {job_id}")
+        _submit(job_id)
+
+
+def advance_invoice_render_job(invoice_render_job: InvoiceRenderJob) -> None:
+    """
+    Called by status polls: renders a job no worker has claimed in this
+    request, so jobs finish even where background threads do not run.
+    """
+    resume_invoice_render_job(invoice_render_job)
+    if invoice_render_job.status != "pending":
+        return
+    job_id = invoice_render_job.invoice_render_job_id
+    logger.info(f"Rendering invoice render job {job_id} in its status poll")
+    run_invoice_render_job(job_id)
+    db.session.refresh(invoice_render_job)
+
+
+def _submit(invoice_render_job_id: int) -> None:
+    if not current_app.config.get("INVOICE_RENDER_IN_BACKGROUND", True):
+        return
+    app = current_app._get_current_object()
+    get_job_pool().submit(_run, app, invoice_render_job_id)
+
+
+def _claim(invoice_render_job_id: int) -> bool:
+    # Only one worker moves a job from pending to running.
+    result = db.session.execute(
+        update(InvoiceRenderJob)
+        .where(
+            InvoiceRenderJob.invoice_render_job_id == invoice_render_job_id,
+            InvoiceRenderJob.status == "pending",
+        )
+        .values(status="running", updated_at=datetime.datetime.utcnow())
+    )
+    db.session.commit()
+    return result.rowcount == 1
+
+
+def _finish(invoice_render_job_id: int, **values) -> None:
+    db.session.execute(
+        update(InvoiceRenderJob)
+        .where(InvoiceRenderJob.invoice_render_job_id == invoice_render_job_id)
+        .values(updated_at=datetime.datetime.utcnow(), **values)
+    )
+    db.session.commit()
+
+
+def run_invoice_render_job(invoice_render_job_id: int) -> None:
+    """Claims a pending job and renders it, unless another worker has it."""
+    try:
+        if not _claim(invoice_render_job_id):
+            return
+        invoice_render_job = get_invoice_render_job_by_id(invoice_render_job_id)
+        invoice = db.session.get(Invoice, invoice_render_job.invoice_id)
+        lines = list(invoice_cache_service.get_invoice_lines(invoice))
+        content_hash = invoice_cache_service.get_invoice_hash(invoice, lines)
+        if not invoice_cache_service.get_invoice_pdf(content_hash):
+            invoice_data = invoice_download_service.get_invoice_data(invoice, lines)
+            pdf_bytes = invoice_download_service.render(invoice_data)
+            invoice_cache_service.add_invoice_pdf(invoice, content_hash, pdf_bytes)
+        _finish(invoice_render_job_id, status="done", content_hash=content_hash)
+    except Exception as e:
+        logger.error(f"Failed to render invoice job {invoice_render_job_id}: {e}")
+        db.session.rollback()
+        _finish(invoice_render_job_id, status="failed", error=f"{e}"[:500])
+
+
+def _run(app, invoice_render_job_id: int) -> None:
+    with app.app_context():
+        run_invoice_render_job(invoice_render_job_id)
@@ -1,17 +1,35 @@
 import datetime
+from decimal import Decimal
 import hashlib
+import itertools
 from typing import Optional
 
 from loguru import logger
-from sqlalchemy import asc, desc, func
+from sqlalchemy import asc, case, desc, func, insert, or_, select, update
+from sqlalchemy.orm import contains_eager, joinedload
 
 from app import db
+from forms.invoice_batch_form import InvoiceBatchForm
 from forms.invoice_form import InvoiceForm
 from forms.invoice_generate_form import InvoiceGenerateForm
 
 # from forms.invoice_filter_form import invoiceFilterForm
+from models.booking import Booking
+from models.customer import Customer
 from models.invoice import Invoice
-from services import booking_service, invoice_download_service
+from models.invoice_line import InvoiceLine
+from models.service import Service
+from services import (
+    booking_event_service,
+    booking_fragment_service,
+    booking_series_service,
+    booking_service,
+    invoice_cache_service,
+    invoice_download_service,
+)
+
+invoice_reference_start = "W4LKIES"
+invoice_days_due = 7
 
 
 def get_invoice_form(
@@ -34,15 +52,98 @@ def get_invoice_generate_form(ignore_request_data: bool = False) -> InvoiceGener
     return invoice_generate_form
 
 
+def get_invoice_batch_form(ignore_request_data: bool = False) -> InvoiceBatchForm:
+    if ignore_request_data:
+        invoice_batch_form = InvoiceBatchForm(formdata=None)
+    else:
+        invoice_batch_form = InvoiceBatchForm()
+    return invoice_batch_form
+
+
 def get_invoices() -> list[Invoice]:
     # Generate query
     query = db.session.query(Invoice)
+    query = query.options(joinedload(Invoice.customer))
     query = query.order_by(Invoice.date_issued.desc())
     invoices = query.all()
     logger.debug(f"{invoices = }")
     return invoices
 
 
+def get_unbilled_bookings(date_max: Optional[datetime.date] = None) -> list[dict]:
+    """
+    Returns past bookings without an invoice, grouped by customer with the
+    booking count and price subtotal of each group.
+
+    Stored bookings come from one query over the partial unbilled index, with
+    the per-customer totals computed by window aggregates alongside the rows.
+    Series occurrences that were never materialized are unbilled too.
+    Invoicing materializes a series' occurrences in the invoiced window, so
+    each series is only expanded after its last invoiced date.
+    """
+    date_max = date_max or datetime.datetime.now().date()
+    subtotal = func.sum(Service.price).over(partition_by=Booking.customer_id)
+    query = (
+        db.session.query(Booking, subtotal)
+        .join(Booking.customer)
+        .join(Booking.service)
+        .options(
+            contains_eager(Booking.customer),
+            contains_eager(Booking.service),
+            joinedload(Booking.user),
+        )
+        .filter(Booking.invoice_id.is_(None), Booking.date < date_max)
+        .order_by(Customer.name, Booking.customer_id, Booking.date, Booking.time)
+    )
+    groups = {}
+    for booking, price_subtotal in query:
+        group = groups.setdefault(
+            booking.customer_id,
+            {
+                "customer": booking.customer,
+                "bookings": [],
+                "price_subtotal": price_subtotal,
+            },
+        )
+        group["bookings"].append(booking)
+
+    series_date_mins = {
+        booking_series_id: date + datetime.timedelta(days=1)
+        for booking_series_id, date in (
+            booking_series_service.get_last_invoiced_dates().items()
+        )
+    }
+    occurrences = booking_series_service.get_booking_occurrences(
+        date_max=date_max, series_date_mins=series_date_mins
+    )
+    for customer_id, customer_occurrences in itertools.groupby(
+        sorted(occurrences, key=lambda booking: booking.customer_id),
+        key=lambda booking: booking.customer_id,
+    ):
+        customer_occurrences = list(customer_occurrences)
+        group = groups.setdefault(
+            customer_id,
+            {
+                "customer": customer_occurrences[0].customer,
+                "bookings": [],
+                "price_subtotal": Decimal("0.00"),
+            },
+        )
+        group["bookings"] = sorted(
+            group["bookings"] + customer_occurrences,
+            key=lambda booking: (booking.date, booking.time),
+        )
+        group["price_subtotal"] += sum(
+            booking.service.price for booking in customer_occurrences
+        )
+
+    unbilled_bookings = sorted(
+        groups.values(), key=lambda group: group["customer"].name
+    )
+    logger.debug(f"Found unbilled bookings for {len(unbilled_bookings)} customers")
+    return unbilled_bookings
+
+
 def get_invoice_by_id(invoice_id: int) -> Optional[Invoice]:
     invoice = db.session.get(Invoice, invoice_id)
     logger.debug(f"{invoice = }")
@@ -94,6 +195,10 @@ def update_invoice(invoice: Invoice, invoice_data: dict) -> Optional[Invoice]:
         logger.debug(f"{bookings = }")
         invoice.bookings = bookings
 
+    if lines := invoice_data.get("lines"):
+        logger.debug(f"{lines = }")
+        invoice.lines = lines
+
     if updated_by := invoice_data.get("updated_by"):
         logger.debug(f"{updated_by = }")
         invoice.updated_by = updated_by
@@ -103,6 +208,7 @@ def update_invoice(invoice: Invoice, invoice_data: dict) -> Optional[Invoice]:
         invoice.updated_at = updated_at
 
     try:
+        invoice_cache_service.invalidate_invoice_pdfs(invoice.invoice_id)
         db.session.commit()
         return invoice
     except Exception as e:
@@ -136,6 +242,7 @@ def add_invoice(invoice_data: dict) -> Optional[Invoice]:
         price_total=invoice_data.get("price_total"),
         customer_id=invoice_data.get("customer_id"),
         bookings=invoice_data.get("bookings", []),
+        lines=invoice_data.get("lines", []),
         created_at=invoice_data.get("created_at"),
         created_by=invoice_data.get("created_by"),
         updated_at=invoice_data.get("updated_at"),
@@ -152,32 +259,73 @@ def add_invoice(invoice_data: dict) -> Optional[Invoice]:
         return
 
 
-def generate_invoice_data(customer_id: int, date_start: str, date_end: str) -> dict:
-    reference_start = "W4LKIES"
-    days_due = 7
+def get_invoice_lines_data(bookings: list[Booking]) -> list[InvoiceLine]:
+    # Snapshot what each booking is billed as at the time of invoicing.
+    lines = [
+        InvoiceLine(
+            booking_id=booking.booking_id,
+            date=booking.date,
+            time=booking.time,
+            service_name=booking.service.name,
+            price=booking.service.price,
+        )
+        for booking in bookings
+    ]
+    return lines
+
+
+def get_invoice_lines(invoice_id: int) -> list[InvoiceLine]:
+    lines = (
+        db.session.query(InvoiceLine)
+        .filter(InvoiceLine.invoice_id == invoice_id)
+        .order_by(InvoiceLine.date, InvoiceLine.time, InvoiceLine.invoice_line_id)
+        .all()
+    )
+    return lines
 
-    # Get unique reference for invoice
+
+def get_invoice_reference(customer_id: int, date_start, date_end) -> str:
+    # Unique reference for a customer's invoice over a period
     reference_hash = (
         hashlib.sha256(f"{customer_id}-{date_start}-{date_end}".encode("UTF-8"))
         .hexdigest()[:8]
         .upper()
     )
-    reference = f"{reference_start}-{reference_hash}"
+    reference = f"{invoice_reference_start}-{reference_hash}"
+    return reference
+
+
+def generate_invoice_data(customer_id: int, date_start: str, date_end: str) -> dict:
+    reference = get_invoice_reference(customer_id, date_start, date_end)
     logger.debug(f"{reference = }")
 
-    # Get the customer bookings.
+    # Get the customer bookings, making any series occurrences concrete so
+    # they can be linked to the invoice.
+    booking_series_service.materialize_booking_occurrences(
+        customer_id=customer_id, date_min=date_start, date_max=date_end
+    )
     bookings = booking_service.get_bookings(
-        date_min=date_start, date_max=date_end, customer_id=customer_id
+        date_min=date_start,
+        date_max=date_end,
+        customer_id=customer_id,
+        include_series=False,
     )
     logger.debug(f"Found {len(bookings)} bookings for invoice")
     logger.debug(f"{bookings = }")
 
-    # Get the total price of the bookings
-    price_subtotal = 0.0
-    price_discount = 0.0
-    for booking in bookings:
-        logger.debug(f"{booking.date} {booking.service.name} {booking.service.price}")
-        price_subtotal += booking.service.price
+    # Get the total price of the bookings, summed exactly in the database
+    price_subtotal = (
+        db.session.query(func.coalesce(func.sum(Service.price), 0))
+        .join(Booking.service)
+        .filter(
+            Booking.customer_id == customer_id,
+            Booking.date >= date_start,
+            Booking.date < date_end,
+        )
+        .scalar()
+    )
+    price_subtotal = Decimal(price_subtotal)
+    price_discount = Decimal("0.00")
     price_total = price_subtotal - price_discount
     logger.debug(f"{price_discount = } {price_total = }")
 
@@ -186,12 +334,14 @@ def generate_invoice_data(customer_id: int, date_start: str, date_end: str) -> d
         "date_start": date_start,
         "date_end": date_end,
         "date_issued": datetime.datetime.now(),
-        "date_due": datetime.datetime.now() + datetime.timedelta(days=days_due),
+        "date_due": datetime.datetime.now()
+        + datetime.timedelta(days=invoice_days_due),
         "price_subtotal": price_subtotal,
         "price_discount": price_discount,
         "price_total": price_total,
         "customer_id": customer_id,
         "bookings": bookings,
+        "lines": get_invoice_lines_data(bookings),
     }
 
     return invoice_data
@@ -214,36 +364,259 @@ def generate_invoice(invoice_data: dict) -> Optional[Invoice]:
     return new_invoice
 
 
-def regenerate_invoice_by_id(invoice_id: int, updated_by: int) -> Optional[Invoice]:
+def generate_invoices(
+    date_start: datetime.date, date_end: datetime.date, created_by: int
+) -> Optional[list[dict]]:
+    """
+    Invoices every active customer's unbilled bookings in [date_start,
+    date_end) at once. Totals come from one grouped query, the invoices are
+    inserted in one statement, the bookings linked by one UPDATE and their
+    lines snapshotted by one INSERT ... SELECT.
+
+    Returns one result per invoiced customer, or None if the run failed.
+    """
+    booking_series_service.materialize_booking_occurrences(
+        date_min=date_start, date_max=date_end, created_by=created_by
+    )
+    filters = [
+        Booking.invoice_id.is_(None),
+        Booking.date >= date_start,
+        Booking.date < date_end,
+        Customer.is_active.is_(True),
+    ]
+    totals = (
+        db.session.query(
+            Booking.customer_id,
+            func.count(Booking.booking_id),
+            func.sum(Service.price),
+        )
+        .join(Booking.customer)
+        .join(Booking.service)
+        .filter(*filters)
+        .group_by(Booking.customer_id)
+        .all()
+    )
+    if not totals:
+        return []
+
+    now = datetime.datetime.now()
+    invoice_rows = [
+        {
+            "reference": get_invoice_reference(customer_id, date_start, date_end),
+            "date_start": date_start,
+            "date_end": date_end,
+            "date_issued": now,
+            "date_due": now + datetime.timedelta(days=invoice_days_due),
+            "price_subtotal": price_subtotal,
+            "price_discount": Decimal("0.00"),
+            "price_total": price_subtotal,
+            "customer_id": customer_id,
+            "created_at": now,
+            "created_by": created_by,
+        }
+        for customer_id, _, price_subtotal in totals
+    ]
+    try:
+        result = db.session.execute(
+            insert(Invoice).returning(Invoice.invoice_id, Invoice.customer_id),
+            invoice_rows,
+        )
+        invoice_ids = {row.customer_id: row.invoice_id for row in result}
+        result = db.session.execute(
+            update(Booking)
+            .where(
+                Booking.invoice_id.is_(None),
+                Booking.date >= date_start,
+                Booking.date < date_end,
+                Booking.customer_id.in_(list(invoice_ids)),
+            )
+            .values(invoice_id=case(invoice_ids, value=Booking.customer_id))
+            .returning(Booking.booking_id),
+            execution_options={"synchronize_session": False},
+        )
+        booking_ids = [row.booking_id for row in result]
+        lines = (
+            select(
+                Booking.invoice_id,
+                Booking.booking_id,
+                Booking.date,
+                Booking.time,
+                Service.name,
+                Service.price,
+            )
+            .join(Booking.service)
+            .where(Booking.invoice_id.in_(list(invoice_ids.values())))
+        )
+        db.session.execute(
+            insert(InvoiceLine).from_select(
+                ["invoice_id", "booking_id", "date", "time", "service_name", "price"],
+                lines,
+            )
+        )
+        # Statements bypass the flush hooks, so notify live boards here.
+        booking_event_service.publish(
+            [("updated", booking_id) for booking_id in booking_ids]
+        )
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"Error generating invoices: {e}")
+        db.session.rollback()
+        return
+    logger.info(f"Invoiced {len(booking_ids)} bookings, {len(invoice_ids)} customers")
+
+    booking_fragment_service.invalidate_booking_rows(set(booking_ids))
+
+    customers = {
+        customer.customer_id: customer
+        for customer in db.session.query(Customer).filter(
+            Customer.customer_id.in_(list(invoice_ids))
+        )
+    }
+    invoice_results = [
+        {
+            "customer": customers[customer_id],
+            "invoice_id": invoice_ids[customer_id],
+            "reference": invoice_row["reference"],
+            "booking_count": booking_count,
+            "price_total": invoice_row["price_total"],
+        }
+        for (customer_id, booking_count, _), invoice_row in zip(totals, invoice_rows)
+    ]
+    invoice_results.sort(key=lambda invoice_result: invoice_result["customer"].name)
+    return invoice_results
+
+
+def regenerate_invoice_by_id(invoice_id: int, updated_by: int) -> Optional[dict]:
+    """
+    Brings an invoice up to date with the bookings now in its period,
+    touching only what changed: bookings that joined or left are relinked
+    with one UPDATE each, their lines inserted or deleted, and the totals
+    adjusted by the difference.
+
+    Returns the invoice with the added and removed lines, or None on error.
+    """
     invoice = get_invoice_by_id(invoice_id)
     if not invoice:
         return
 
-    customer_id = invoice.customer_id
-    date_start = invoice.date_start
-    date_end = invoice.date_end
+    booking_series_service.materialize_booking_occurrences(
+        customer_id=invoice.customer_id,
+        date_min=invoice.date_start,
+        date_max=invoice.date_end,
+        created_by=updated_by,
+    )
+    matched_bookings = (
+        db.session.query(Booking)
+        .join(Booking.service)
+        .options(contains_eager(Booking.service))
+        .filter(
+            Booking.customer_id == invoice.customer_id,
+            Booking.date >= invoice.date_start,
+            Booking.date < invoice.date_end,
+            or_(Booking.invoice_id.is_(None), Booking.invoice_id == invoice_id),
+        )
+        .all()
+    )
+    matched_ids = {booking.booking_id for booking in matched_bookings}
+    current_ids = {
+        booking_id
+        for (booking_id,) in db.session.query(Booking.booking_id).filter(
+            Booking.invoice_id == invoice_id
+        )
+    }
+    added_ids = matched_ids - current_ids
+    removed_ids = current_ids - matched_ids
+    logger.debug(f"{added_ids = } {removed_ids = }")
+
+    # Lines whose booking was deleted since invoicing are dropped too.
+    removed_lines = (
+        db.session.query(InvoiceLine)
+        .filter(
+            InvoiceLine.invoice_id == invoice_id,
+            or_(
+                InvoiceLine.booking_id.in_(removed_ids),
+                InvoiceLine.booking_id.is_(None),
+            ),
+        )
+        .order_by(InvoiceLine.date, InvoiceLine.time)
+        .all()
+    )
+    added_bookings = [
+        booking for booking in matched_bookings if booking.booking_id in added_ids
+    ]
+    added_bookings.sort(key=lambda booking: (booking.date, booking.time))
+    added_lines = get_invoice_lines_data(added_bookings)
+    if not added_lines and not removed_lines:
+        return {"invoice": invoice, "added": [], "removed": []}
+
+    price_added = sum((line.price for line in added_lines), Decimal("0.00"))
+    price_removed = sum((line.price for line in removed_lines), Decimal("0.00"))
+    try:
+        if added_ids:
+            db.session.execute(
+                update(Booking)
+                .where(Booking.booking_id.in_(added_ids), Booking.invoice_id.is_(None))
+                .values(invoice_id=invoice_id),
+                execution_options={"synchronize_session": False},
+            )
+        if removed_ids:
+            db.session.execute(
+                update(Booking)
+                .where(
+                    Booking.booking_id.in_(removed_ids),
+                    Booking.invoice_id == invoice_id,
+                )
+                .values(invoice_id=None),
+                execution_options={"synchronize_session": False},
+            )
+        for line in removed_lines:
+            db.session.delete(line)
+        for line in added_lines:
+            line.invoice_id = invoice_id
+            db.session.add(line)
+        invoice.price_subtotal = invoice.price_subtotal + price_added - price_removed
+        invoice.price_total = invoice.price_subtotal - invoice.price_discount
+        invoice.updated_by = updated_by
+        invoice.updated_at = datetime.datetime.now()
+        invoice_cache_service.invalidate_invoice_pdfs(invoice_id)
+        # Statements bypass the flush hooks, so notify live boards here.
+        booking_ids = added_ids | removed_ids
+        booking_event_service.publish(
+            [("updated", booking_id) for booking_id in booking_ids]
+        )
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"Error regenerating invoice: {e}")
+        db.session.rollback()
+        return
+    logger.info(f"Regenerated {invoice = } {price_added = } {price_removed = }")
 
-    new_invoice_data = generate_invoice_data(customer_id, date_start, date_end)
+    booking_fragment_service.invalidate_booking_rows(booking_ids)
+    return {"invoice": invoice, "added": added_lines, "removed": removed_lines}
 
-    new_invoice_data["updated_by"] = updated_by
-    new_invoice_data["updated_at"] = datetime.datetime.now()
-    # invoice = update_invoice_by_id(invoice_id, new_invoice_data)
-    invoice = update_invoice(invoice, new_invoice_data)
-    return invoice
 
+def get_invoice_pdf_etag(invoice: Invoice) -> str:
+    # The content hash changes exactly when the rendered PDF would.
+    return invoice_cache_service.get_invoice_hash(invoice)
 
-def download_invoice_by_id(invoice_id: int) -> Optional[bytes]:
-    invoice = get_invoice_by_id(invoice_id)
-    logger.debug(f"{invoice = }")
-    if invoice is not None:
-        try:
-            pdf_file, pdf_filepath = invoice_download_service.create(invoice)
-            return pdf_file, pdf_filepath
-        except Exception as e:
-            db.session.rollback()
-            logger.error(f"Failed to download invoice: {e}")
-    else:
-        logger.error(f"Invoice with ID {invoice_id} does not exist")
+
+def download_invoice(
+    invoice: Invoice, content_hash: str
+) -> Optional[tuple[bytes, str]]:
+    """Returns the PDF bytes and filename of an invoice, rendering on a cache miss."""
+    try:
+        pdf_filepath = invoice_download_service.get_filename(invoice)
+        if pdf_bytes := invoice_cache_service.get_invoice_pdf(content_hash):
+            logger.debug(f"Serving cached invoice pdf {content_hash = }")
+            return pdf_bytes, pdf_filepath
+        lines = invoice_cache_service.get_invoice_lines(invoice)
+        pdf_file, pdf_filepath = invoice_download_service.create(invoice, lines)
+        pdf_bytes = pdf_file.getvalue()
+        invoice_cache_service.add_invoice_pdf(invoice, content_hash, pdf_bytes)
+        return pdf_bytes, pdf_filepath
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to download invoice: {e}")
 
 
 def delete_invoice_by_id(invoice_id: int) -> None:
@@ -251,6 +624,7 @@ def delete_invoice_by_id(invoice_id: int) -> None:
     logger.debug(f"{invoice = }")
     if invoice is not None:
         try:
+            invoice_cache_service.invalidate_invoice_pdfs(invoice_id)
             db.session.delete(invoice)
             db.session.commit()
         except Exception as e:
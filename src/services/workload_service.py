@@ -0,0 +1,238 @@
+from collections import defaultdict
+import datetime
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import event, func, inspect, select, tuple_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import joinedload
+
+from app import db
+from models.booking import Booking
+from models.service import Service
+from models.user_workload import UserWorkload
+from services import booking_series_service, booking_service
+
+# INSERT ... ON CONFLICT per dialect: Postgres when deployed, SQLite in tests.
+upserts = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def get_week_start(date: datetime.date) -> datetime.date:
+    return date - datetime.timedelta(days=date.weekday())
+
+
+def _get_booking_minutes():
+    return func.coalesce(
+        Service.duration, booking_service.default_service_duration_minutes
+    )
+
+
+def refresh_workload(
+    session, date_min: datetime.date, date_max: datetime.date, user_ids=None
+) -> None:
+    """
+    Recomputes the rollup rows of every week touching [date_min, date_max]
+    (optionally only for `user_ids`) from one aggregate over the bookings.
+    """
+    week_min = get_week_start(date_min)
+    week_max = get_week_start(date_max) + datetime.timedelta(days=7)
+    keys = _get_workload_keys(session, week_min, week_max, user_ids)
+    _replace_workload(session, week_min, week_max, user_ids, keys)
+
+
+def refresh_workload_weeks(session, weeks: set) -> None:
+    """
+    Recomputes the rollup rows for a set of (user_id, week_start) pairs with
+    one aggregate, one delete and one upsert however many pairs there are.
+    """
+    if not weeks:
+        return
+    week_starts = [week_start for _, week_start in weeks]
+    week_min = min(week_starts)
+    week_max = max(week_starts) + datetime.timedelta(days=7)
+    user_ids = {user_id for user_id, _ in weeks}
+    keys = _get_workload_keys(session, week_min, week_max, user_ids)
+    keys = {key: workload for key, workload in keys.items() if key in weeks}
+    table = UserWorkload.__table__
+    empty_weeks = weeks - set(keys)
+    if empty_weeks:
+        session.execute(
+            table.delete().where(
+                tuple_(table.c.user_id, table.c.week_start).in_(list(empty_weeks))
+            )
+        )
+    _upsert_workload(session, keys)
+
+
+def get_service_workload_weeks(session, service_ids: set) -> set:
+    """Returns the (user_id, week_start) pairs with bookings of the services."""
+    query = (
+        select(Booking.user_id, Booking.date)
+        .where(Booking.service_id.in_(service_ids), Booking.user_id.is_not(None))
+        .distinct()
+    )
+    weeks = {
+        (user_id, get_week_start(date)) for user_id, date in session.execute(query)
+    }
+    return weeks
+
+
+def _get_workload_keys(session, week_min, week_max, user_ids=None) -> dict:
+    # Booking count and minutes per (user_id, week_start) in [week_min, week_max).
+    keys = {}
+    aggregate = (
+        select(
+            Booking.user_id,
+            Booking.date,
+            func.count(Booking.booking_id),
+            func.sum(_get_booking_minutes()),
+        )
+        .join(Service, Booking.service_id == Service.service_id)
+        .where(
+            Booking.user_id.is_not(None),
+            Booking.date >= week_min,
+            Booking.date < week_max,
+        )
+        .group_by(Booking.user_id, Booking.date)
+    )
+    if user_ids is not None:
+        aggregate = aggregate.where(Booking.user_id.in_(user_ids))
+    for user_id, date, booking_count, minutes in session.execute(aggregate):
+        key = (user_id, get_week_start(date))
+        workload = keys.setdefault(key, {"booking_count": 0, "minutes": 0.0})
+        workload["booking_count"] += booking_count
+        workload["minutes"] += float(minutes or 0.0)
+    return keys
+
+
+def _replace_workload(session, week_min, week_max, user_ids, keys: dict) -> None:
+    table = UserWorkload.__table__
+    statement = table.delete().where(
+        table.c.week_start >= week_min,
+        table.c.week_start < week_max,
+        tuple_(table.c.user_id, table.c.week_start).not_in(list(keys)),
+    )
+    if user_ids is not None:
+        statement = statement.where(table.c.user_id.in_(user_ids))
+    session.execute(statement)
+    _upsert_workload(session, keys)
+
+
+def _upsert_workload(session, keys: dict) -> None:
+    # Upserts rather than delete-and-insert, so two commits touching the same
+    # walker-week never race on the (user_id, week_start) unique key.
+    rows = [
+        {"user_id": user_id, "week_start": week_start} | workload
+        for (user_id, week_start), workload in keys.items()
+    ]
+    if not rows:
+        return
+    table = UserWorkload.__table__
+    insert = upserts[session.get_bind().dialect.name]
+    statement = insert(table).values(rows)
+    statement = statement.on_conflict_do_update(
+        index_elements=[table.c.user_id, table.c.week_start],
+        set_={
+            "booking_count": statement.excluded.booking_count,
+            "minutes": statement.excluded.minutes,
+        },
+    )
+    session.execute(statement)
+
+
+def get_workload(
+    date_min: datetime.date, date_max: datetime.date, user_id: Optional[int] = None
+) -> list[dict]:
+    """
+    Returns hours walked and booking counts per walker per ISO week between
+    `date_min` and `date_max`, read from the rollup table plus any booking
+    series occurrences in the window.
+    """
+    week_min = get_week_start(date_min)
+    week_max = get_week_start(date_max) + datetime.timedelta(days=7)
+    query = (
+        db.session.query(UserWorkload)
+        .options(joinedload(UserWorkload.user))
+        .filter(UserWorkload.week_start >= week_min, UserWorkload.week_start < week_max)
+    )
+    if user_id and int(user_id) > -1:
+        query = query.filter(UserWorkload.user_id == user_id)
+    workloads = defaultdict(lambda: {"booking_count": 0, "minutes": 0.0})
+    for workload in query:
+        key = (workload.week_start, workload.user)
+        workloads[key]["booking_count"] += workload.booking_count
+        workloads[key]["minutes"] += workload.minutes
+
+    occurrences = booking_series_service.get_booking_occurrences(
+        user_id=user_id, date_min=week_min, date_max=week_max
+    )
+    for occurrence in occurrences:
+        if not occurrence.user:
+            continue
+        key = (get_week_start(occurrence.date), occurrence.user)
+        duration = occurrence.service.duration
+        minutes = duration or booking_service.default_service_duration_minutes
+        workloads[key]["booking_count"] += 1
+        workloads[key]["minutes"] += float(minutes)
+
+    workload_rows = [
+        {
+            "week": week_start.isocalendar(),
+            "week_start": week_start,
+            "user": user,
+            "booking_count": workload["booking_count"],
+            "hours": workload["minutes"] / 60.0,
+        }
+        for (week_start, user), workload in workloads.items()
+    ]
+    workload_rows.sort(key=lambda row: (row["week_start"], row["user"].name))
+    return workload_rows
+
+
+@event.listens_for(Booking.user_id, "set", active_history=True)
+@event.listens_for(Booking.date, "set", active_history=True)
+def _load_previous_workload_week(target, value, oldvalue, initiator):
+    # Only here for `active_history`: a booking changed after its attributes
+    # expired still records its previous walker and date for the hook below.
+    pass
+
+
+@event.listens_for(db.session, "after_flush")
+def _collect_workload_weeks(session, flush_context):
+    # Old and new (walker, week) of every changed booking, before history resets.
+    weeks = session.info.setdefault("workload_weeks", set())
+    for instance in session.dirty:
+        # A new duration changes the minutes of every booking of the service.
+        if isinstance(instance, Service):
+            if inspect(instance).attrs.duration.history.has_changes():
+                service_ids = session.info.setdefault("workload_service_ids", set())
+                service_ids.add(instance.service_id)
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        if not isinstance(instance, Booking):
+            continue
+        attrs = inspect(instance).attrs
+        user_ids = {instance.user_id, *attrs.user_id.history.deleted}
+        dates = {instance.date, *attrs.date.history.deleted}
+        for user_id in user_ids:
+            for date in dates:
+                if user_id and isinstance(date, datetime.date):
+                    weeks.add((user_id, get_week_start(date)))
+
+
+@event.listens_for(db.session, "after_flush_postexec")
+def _refresh_workload_weeks(session, flush_context):
+    weeks = session.info.pop("workload_weeks", set())
+    service_ids = session.info.pop("workload_service_ids", set())
+    if not weeks and not service_ids:
+        return
+    with session.no_autoflush:
+        if service_ids:
+            weeks |= get_service_workload_weeks(session, service_ids)
+        logger.debug(f"Refreshing workload {weeks = }")
+        refresh_workload_weeks(session, weeks)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _discard_workload_weeks(session):
+    session.info.pop("workload_weeks", None)
+    session.info.pop("workload_service_ids", None)
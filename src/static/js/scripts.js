@@ -40,6 +40,21 @@ function exportTableToCsv(tableName = 'table') {
   link.click();
 }
 
+// Live booking updates pushed over Server-Sent Events while a booking table is shown
+let bookingsEventSource = null;
+document.body.addEventListener('htmx:afterSettle', function() {
+  const bookings = document.getElementById('bookings');
+  if (bookings && !bookingsEventSource) {
+    bookingsEventSource = new EventSource('/bookings/stream');
+    bookingsEventSource.onmessage = (evt) => {
+      htmx.swap(document.body, evt.data, {swapStyle: 'none'});
+    };
+  } else if (!bookings && bookingsEventSource) {
+    bookingsEventSource.close();
+    bookingsEventSource = null;
+  }
+});
+
 // Catch HTMX form errors
 document.body.addEventListener('htmx:beforeOnLoad', function(evt) {
   if (evt.detail.xhr.status === 422) {
@@ -0,0 +1,144 @@
+from contextlib import contextmanager
+import datetime
+import os
+import sys
+
+from flask.testing import FlaskClient
+import pytest
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+os.environ.setdefault("SQLALCHEMY_DATABASE_URI", "sqlite://")
+os.environ.setdefault("SECRET_KEY", "test")
+
+from app import create_app, db  # noqa: E402
+from config import Config  # noqa: E402
+
+
+class AppContextClient(FlaskClient):
+    def open(self, *args, **kwargs):
+        # Each request gets its own app context (and `g`), as when served.
+        with self.application.app_context():
+            return super().open(*args, **kwargs)
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = create_app(Config)
+    app.config.update(TESTING=True)
+    app.test_client_class = AppContextClient
+    return app
+
+
+@pytest.fixture
+def app_context(app):
+    from services import booking_fragment_service
+
+    with app.app_context():
+        db.create_all()
+        booking_fragment_service.clear_booking_rows()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def admin(app_context):
+    return add_user("Admin", is_admin=True)
+
+
+@pytest.fixture
+def client(app, admin):
+    client = app.test_client()
+    log_in(client, admin)
+    return client
+
+
+def log_in(client, user):
+    with client.session_transaction() as session:
+        session["_user_id"] = str(user.user_id)
+        session["_fresh"] = True
+
+
+def add_user(name, is_admin=False):
+    from models import User
+
+    user = User(
+        name=name,
+        email=f"{name.lower()}@example.com",
+        password_hash="x",
+        is_admin=is_admin,
+        is_active=True,
+    )
+    db.session.add(user)
+    db.session.commit()
+    return user
+
+
+def add_customer(name):
+    from models import Customer
+
+    customer = Customer(
+        name=name,
+        phone="0",
+        email=f"{name.lower()}@example.com",
+        emergency_contact_name="",
+        emergency_contact_phone="0",
+        signed_up_on=datetime.date(2024, 1, 1),
+    )
+    db.session.add(customer)
+    db.session.commit()
+    return customer
+
+
+def add_service(name, price=20, duration=60):
+    from models import Service
+
+    service = Service(name=name, price=price, duration=duration)
+    db.session.add(service)
+    db.session.commit()
+    return service
+
+
+def add_bookings(n, date, time=datetime.time(9), user=None):
+    """Adds `n` bookings on consecutive days, each for its own customer."""
+    from models import Booking
+
+    service = add_service(f"Walk {date}")
+    bookings = []
+    for i in range(n):
+        customer = add_customer(f"Customer {date} {i}")
+        booking = Booking(
+            date=date + datetime.timedelta(days=i),
+            time=time,
+            customer_id=customer.customer_id,
+            service_id=service.service_id,
+            user_id=user.user_id if user else None,
+        )
+        db.session.add(booking)
+        bookings.append(booking)
+    db.session.commit()
+    return bookings
+
+
+@contextmanager
+def recorded_statements():
+    """Collects the SQL statements executed inside the block."""
+    statements = []
+
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", _record)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", _record)
+
+
+def count_statements(client, url) -> int:
+    """Returns how many SQL statements a successful GET of `url` runs."""
+    with recorded_statements() as statements:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(statements)
@@ -0,0 +1,98 @@
+import datetime
+
+from app import db
+from conftest import add_bookings
+
+
+def get_stream(client, last_event_id=None):
+    headers = {}
+    if last_event_id is not None:
+        headers["Last-Event-ID"] = str(last_event_id)
+    response = client.get("/bookings/stream", headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    return response.get_data(as_text=True)
+
+
+def get_last_event_id(stream: str) -> int:
+    ids = [line for line in stream.splitlines() if line.startswith("id: ")]
+    return int(ids[-1].removeprefix("id: "))
+
+
+def test_stream_sends_committed_booking_changes(client):
+    stream = get_stream(client)
+    assert "data:" not in stream
+    last_event_id = get_last_event_id(stream)
+
+    # Committed through the database, as by any other instance.
+    (booking,) = add_bookings(1, datetime.date(2024, 1, 1))
+    booking.time = datetime.time(11)
+    db.session.commit()
+
+    stream = get_stream(client, last_event_id)
+    assert f'id="bookings-{booking.booking_id}"' in stream
+    assert "afterbegin:#bookings tbody" in stream
+    assert 'hx-swap-oob="true"' in stream
+    last_event_id = get_last_event_id(stream)
+
+    db.session.delete(booking)
+    db.session.commit()
+    stream = get_stream(client, last_event_id)
+    assert 'hx-swap-oob="delete"' in stream
+    assert "afterbegin" not in stream
+    assert get_stream(client, get_last_event_id(stream)).count("data:") == 0
+
+
+def test_stream_sends_bulk_updates(client, admin):
+    from services import booking_service
+
+    bookings = add_bookings(3, datetime.date(2024, 1, 1))
+    booking_ids = [booking.booking_id for booking in bookings]
+    last_event_id = get_last_event_id(get_stream(client))
+    booking_service.bulk_update_bookings(
+        {
+            "action": "delete",
+            "user_id": -1,
+            "customer_id": -1,
+            "date_min": datetime.date(2024, 1, 1),
+            "date_max": datetime.date(2024, 1, 31),
+        },
+        admin.user_id,
+    )
+    stream = get_stream(client, last_event_id)
+    for booking_id in booking_ids:
+        assert f'<tr id="bookings-{booking_id}" hx-swap-oob="delete">' in stream
+
+
+def add_old_booking_event():
+    from models import BookingEvent
+
+    booking_event = BookingEvent(
+        kind="updated",
+        booking_id=1,
+        created_at=datetime.datetime.utcnow() - datetime.timedelta(hours=2),
+    )
+    db.session.add(booking_event)
+    db.session.commit()
+    return booking_event.booking_event_id
+
+
+def test_polls_prune_old_events_at_most_once_per_interval(client, monkeypatch):
+    from models import BookingEvent
+    from services import booking_event_service
+
+    monkeypatch.setattr(booking_event_service, "_pruned_at", None)
+    old_booking_event_id = add_old_booking_event()
+
+    # Booking writes only insert their events.
+    add_bookings(1, datetime.date(2024, 1, 1))
+    assert db.session.get(BookingEvent, old_booking_event_id)
+
+    get_stream(client)
+    db.session.expire_all()
+    assert not db.session.get(BookingEvent, old_booking_event_id)
+
+    old_booking_event_id = add_old_booking_event()
+    get_stream(client)
+    db.session.expire_all()
+    assert db.session.get(BookingEvent, old_booking_event_id)
@@ -0,0 +1,86 @@
+import datetime
+
+import pytest
+from sqlalchemy import text
+
+from app import db
+from conftest import add_customer, add_service, add_user
+
+number_of_bookings = 100_000
+
+
+@pytest.fixture
+def seeded_bookings(app_context):
+    from models import Booking, Invoice
+
+    users = [add_user(f"Walker {i}") for i in range(10)]
+    customers = [add_customer(f"Customer {i}") for i in range(200)]
+    service = add_service("Walk")
+    invoice = Invoice(
+        reference="2024-01-1",
+        date_start=datetime.date(2024, 1, 1),
+        date_end=datetime.date(2024, 1, 31),
+        date_issued=datetime.date(2024, 1, 31),
+        date_due=datetime.date(2024, 2, 7),
+        price_subtotal=0,
+        price_discount=0,
+        price_total=0,
+        customer_id=customers[0].customer_id,
+    )
+    db.session.add(invoice)
+    db.session.commit()
+    date = datetime.date(2015, 1, 1)
+    db.session.execute(
+        Booking.__table__.insert(),
+        [
+            {
+                "date": date + datetime.timedelta(days=i // 30),
+                "time": datetime.time(8 + i % 10),
+                "customer_id": customers[i % len(customers)].customer_id,
+                "service_id": service.service_id,
+                "user_id": users[i % len(users)].user_id,
+                "invoice_id": invoice.invoice_id if i % 100 == 0 else None,
+            }
+            for i in range(number_of_bookings)
+        ],
+    )
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+    return users, customers, invoice
+
+
+def get_query_plan(query) -> str:
+    statement = query.statement.compile(
+        dialect=db.engine.dialect, compile_kwargs={"literal_binds": True}
+    )
+    rows = db.session.execute(text(f"EXPLAIN QUERY PLAN {statement}"))
+    query_plan = "\n".join(row.detail for row in rows)
+    print(query_plan)
+    return query_plan
+
+
+def test_booking_list_queries_use_indexes(seeded_bookings):
+    from models import Booking
+    from services import booking_service
+
+    users, customers, invoice = seeded_bookings
+    date_min, date_max = datetime.date(2020, 1, 1), datetime.date(2020, 2, 1)
+
+    query = booking_service.get_bookings_query().limit(50)
+    assert "USING INDEX ix_booking_date_time" in get_query_plan(query)
+
+    query = booking_service.get_bookings_query(date_min=date_min, date_max=date_max)
+    assert "USING INDEX ix_booking_date_time" in get_query_plan(query)
+
+    query = booking_service.get_bookings_query(user_id=users[0].user_id).limit(50)
+    assert "USING INDEX ix_booking_user_id_date" in get_query_plan(query)
+
+    query = booking_service.get_bookings_query(
+        customer_id=customers[0].customer_id, date_min=date_min, date_max=date_max
+    )
+    assert "_customer_id_date (customer_id=? AND date>? AND date<?)" in (
+        get_query_plan(query).replace(">=", ">")
+    )
+
+    query = db.session.query(Booking).filter(Booking.invoice_id == invoice.invoice_id)
+    assert "USING INDEX ix_booking_invoice_id" in get_query_plan(query)
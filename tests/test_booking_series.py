@@ -0,0 +1,122 @@
+import datetime
+import itertools
+
+import pytest
+
+from app import db
+from conftest import add_customer, add_service, recorded_statements
+
+
+@pytest.mark.parametrize("interval_weeks", [1, 2, 3])
+@pytest.mark.parametrize("weekdays", ["0", "1,4", "0,2,6"])
+@pytest.mark.parametrize("count", [None, 7])
+@pytest.mark.parametrize("date_until", [None, datetime.date(2024, 5, 9)])
+def test_descending_dates_match_ascending(interval_weeks, weekdays, count, date_until):
+    from models import BookingSeries
+    from services import booking_series_service
+
+    booking_series = BookingSeries(
+        date_start=datetime.date(2024, 1, 3),
+        interval_weeks=interval_weeks,
+        weekdays=weekdays,
+        count=count,
+        date_until=date_until,
+    )
+    windows = [
+        (None, datetime.date(2024, 9, 1)),
+        (datetime.date(2024, 2, 6), datetime.date(2024, 4, 12)),
+        (datetime.date(2023, 1, 1), datetime.date(2024, 1, 4)),
+        (datetime.date(2024, 8, 1), datetime.date(2024, 8, 2)),
+    ]
+    for date_min, date_max in windows:
+        ascending = booking_series_service.get_occurrence_dates(
+            booking_series, date_min, date_max
+        )
+        descending = booking_series_service.get_occurrence_dates_descending(
+            booking_series, date_min, date_max
+        )
+        assert list(descending) == list(reversed(list(ascending)))
+
+
+def add_weekly_series(date_start):
+    from models import BookingSeries
+
+    customer = add_customer(f"Customer {date_start}")
+    service = add_service(f"Walk {date_start}")
+    booking_series = BookingSeries(
+        date_start=date_start,
+        time=datetime.time(10),
+        weekdays="0,2,4",
+        customer_id=customer.customer_id,
+        service_id=service.service_id,
+    )
+    db.session.add(booking_series)
+    db.session.commit()
+    return booking_series
+
+
+def test_series_pages_cover_window_lazily(app_context, monkeypatch):
+    from services import booking_series_service, booking_service
+
+    add_weekly_series(datetime.date(2020, 1, 1))
+    add_weekly_series(datetime.date(2020, 1, 2))
+    date_max = datetime.date(2024, 1, 1)
+
+    expected = list(
+        booking_series_service.get_booking_occurrences(
+            date_max=date_max, descending=True
+        )
+    )
+    built = itertools.count()
+    get_booking_occurrence = booking_series_service.get_booking_occurrence
+
+    def _counted(*args):
+        next(built)
+        return get_booking_occurrence(*args)
+
+    monkeypatch.setattr(booking_series_service, "get_booking_occurrence", _counted)
+
+    pages = []
+    cursor = None
+    while True:
+        page = booking_service.get_bookings(date_max=date_max, cursor=cursor, limit=20)
+        pages.append(page)
+        cursor = booking_service.get_next_booking_cursor(page, 20)
+        if not cursor or len(pages) > 3:
+            break
+
+    # Each page only builds about a page of occurrences per series.
+    assert next(built) <= 4 * (20 + 1) * 2
+    found = [booking for page in pages for booking in page]
+    assert [(booking.date, booking.booking_series_id) for booking in found] == [
+        (booking.date, booking.booking_series_id) for booking in expected[:80]
+    ]
+
+
+@pytest.mark.parametrize("repeating_weeks", [52, 104])
+def test_repeating_booking_is_saved_in_one_insert(app_context, repeating_weeks):
+    from models import BookingSeries
+    from services import booking_series_service, booking_service
+
+    customer = add_customer("Customer")
+    service = add_service("Walk")
+    booking_data = {
+        "date": datetime.date(2024, 1, 1),
+        "time": "09:00:00",
+        "customer_id": customer.customer_id,
+        "service_id": service.service_id,
+        "repeating_weeks": repeating_weeks,
+    }
+    with recorded_statements() as statements:
+        assert booking_service.add_booking(booking_data)
+    inserts = [statement for statement in statements if statement.startswith("INSERT")]
+    assert len(inserts) == 1
+
+    occurrences = booking_series_service.get_booking_occurrences(
+        date_min=datetime.date(2024, 1, 1), date_max=datetime.date(2026, 1, 1)
+    )
+    assert len(list(occurrences)) == repeating_weeks + 1
+
+    # A series that fails to save leaves nothing behind.
+    assert not booking_service.add_booking(booking_data | {"customer_id": None})
+    assert db.session.query(BookingSeries).count() == 1
@@ -0,0 +1,123 @@
+import datetime
+import re
+import time
+
+import pytest
+
+from conftest import add_bookings, add_user, count_statements, log_in
+
+
+def test_bookings_page_query_count_is_constant(client):
+    from services import booking_fragment_service
+
+    walker = add_user("Walker")
+    add_bookings(3, datetime.date(2024, 1, 1), user=walker)
+    few = count_statements(client, "/bookings/")
+
+    add_bookings(40, datetime.date(2024, 3, 1), user=walker)
+    booking_fragment_service.clear_booking_rows()
+    many = count_statements(client, "/bookings/")
+
+    assert many == few
+
+
+def get_csrf_tokens(response) -> set:
+    return set(re.findall(r'"X-CSRFToken": "([^"]+)"', response.get_data(as_text=True)))
+
+
+def test_cached_booking_rows_carry_each_sessions_csrf_token(app, client):
+    first_booking, second_booking = add_bookings(2, datetime.date(2024, 1, 1))
+    other_client = app.test_client()
+    log_in(other_client, add_user("Other", is_admin=True))
+
+    tokens = get_csrf_tokens(client.get("/bookings/"))
+    other_tokens = get_csrf_tokens(other_client.get("/bookings/"))
+    assert tokens and other_tokens
+    assert tokens.isdisjoint(other_tokens)
+
+    # Each session can act on the row with the token it was served.
+    headers = {"X-CSRFToken": other_tokens.pop()}
+    url = f"/bookings/{first_booking.booking_id}"
+    assert other_client.delete(url, headers=headers).status_code == 200
+    headers = {"X-CSRFToken": tokens.pop()}
+    url = f"/bookings/{second_booking.booking_id}"
+    assert client.delete(url, headers=headers).status_code == 200
+
+
+def render_rows(app, user, bookings) -> tuple[float, list]:
+    from flask_login import login_user
+    from flask_wtf.csrf import generate_csrf
+    from services import booking_fragment_service
+
+    with app.test_request_context():
+        login_user(user)
+        start = time.perf_counter()
+        booking_rows = [
+            booking_fragment_service.render_booking_row(booking)
+            for booking in bookings
+        ]
+        elapsed = time.perf_counter() - start
+        assert all(generate_csrf() in booking_row for booking_row in booking_rows)
+    return elapsed, booking_rows
+
+
+def test_booking_row_cache_is_shared_across_sessions(app, admin, monkeypatch):
+    from services import booking_fragment_service, booking_service
+
+    other_admin = add_user("Other", is_admin=True)
+    add_bookings(500, datetime.date(2024, 1, 1), user=add_user("Walker"))
+    bookings = booking_service.get_bookings(include_series=False)
+    rendered = []
+    render_template = booking_fragment_service.render_template
+
+    def _render_template(*args, **kwargs):
+        rendered.append(args[0])
+        return render_template(*args, **kwargs)
+
+    monkeypatch.setattr(booking_fragment_service, "render_template", _render_template)
+
+    cold, _ = render_rows(app, admin, bookings)
+    assert len(rendered) == 500
+    warm, _ = render_rows(app, other_admin, bookings)
+    assert len(rendered) == 500
+    print(f"500 booking rows: cold {cold * 1000:.1f} ms, warm {warm * 1000:.1f} ms")
+    assert warm < cold
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/bookings/calendar?month=2024-13",
+        "/bookings/calendar?month=January",
+        "/bookings/calendar/2024-02-30",
+        "/bookings/calendar/today",
+        "/bookings/workload?date_min=2024-01-01&date_max=soon",
+    ],
+)
+def test_bad_dates_are_rejected(client, url):
+    response = client.get(url)
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "/bookings/calendar?month=2024-02",
+        "/bookings/calendar/2024-02-29",
+        "/bookings/workload?date_min=2024-01-01&date_max=2024-02-01",
+    ],
+)
+def test_good_dates_are_accepted(client, url):
+    response = client.get(url)
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("endpoint", ["", "past", "future"])
+@pytest.mark.parametrize(
+    "cursor", ["x", "2024-01-01_09:00:00", "2024-01-01_09:00:00_one", "2024-1-1_9_1"]
+)
+def test_malformed_cursor_is_rejected(client, endpoint, cursor):
+    add_bookings(3, datetime.date(2024, 1, 1))
+    response = client.get(f"/bookings/{endpoint}", query_string={"cursor": cursor})
+    assert response.status_code == 400
+    assert b"bookings-" not in response.data
@@ -0,0 +1,185 @@
+import datetime
+
+import pytest
+
+from app import db
+from conftest import add_bookings, add_customer, add_service, add_user
+
+monday = datetime.date(2024, 1, 1)
+
+
+@pytest.fixture
+def form_client(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+    return client
+
+
+def add_weekly_series(user, date_start=monday, time=datetime.time(9)):
+    from models import BookingSeries
+
+    customer = add_customer(f"Series customer {user.name}")
+    service = add_service(f"Series walk {user.name}")
+    booking_series = BookingSeries(
+        date_start=date_start,
+        time=time,
+        weekdays="0",
+        customer_id=customer.customer_id,
+        service_id=service.service_id,
+        user_id=user.user_id,
+    )
+    db.session.add(booking_series)
+    db.session.commit()
+    return booking_series
+
+
+def post_bulk(client, **form):
+    data = {
+        "user_id": -1,
+        "customer_id": -1,
+        "date_min": "2024-01-01",
+        "date_max": "2024-01-21",
+        "new_user_id": "",
+        "days": 0,
+    } | form
+    return client.post("/bookings/bulk", data=data)
+
+
+def get_walkers(date_min, date_max) -> list:
+    from services import booking_service
+
+    bookings = booking_service.get_bookings(
+        date_min=date_min, date_max=date_max, descending=False
+    )
+    return [(booking.date, booking.user_id) for booking in bookings]
+
+
+def test_reassign_includes_series_occurrences(form_client, admin):
+    sick_walker, walker = add_user("Sick"), add_user("Walker")
+    booking_series = add_weekly_series(sick_walker)
+
+    response = post_bulk(
+        form_client,
+        action="reassign",
+        user_id=sick_walker.user_id,
+        new_user_id=walker.user_id,
+    )
+    assert response.status_code == 200
+    assert "<b>3</b> bookings changed" in response.get_data(as_text=True)
+
+    db.session.expire_all()
+    assert get_walkers(monday, datetime.date(2024, 2, 1)) == [
+        (datetime.date(2024, 1, 1), walker.user_id),
+        (datetime.date(2024, 1, 8), walker.user_id),
+        (datetime.date(2024, 1, 15), walker.user_id),
+        (datetime.date(2024, 1, 22), sick_walker.user_id),
+        (datetime.date(2024, 1, 29), sick_walker.user_id),
+    ]
+    assert len(booking_series.exceptions) == 3
+
+
+def test_delete_includes_series_occurrences(form_client):
+    add_weekly_series(add_user("Walker"))
+
+    response = post_bulk(form_client, action="delete")
+    assert response.status_code == 200
+
+    db.session.expire_all()
+    assert [date for date, _ in get_walkers(monday, datetime.date(2024, 2, 1))] == [
+        datetime.date(2024, 1, 22),
+        datetime.date(2024, 1, 29),
+    ]
+
+
+def test_reassign_rejects_double_booking(form_client):
+    sick_walker, walker = add_user("Sick"), add_user("Walker")
+    add_weekly_series(sick_walker, time=datetime.time(9))
+    add_bookings(1, datetime.date(2024, 1, 8), datetime.time(9, 30), user=walker)
+
+    response = post_bulk(
+        form_client,
+        action="reassign",
+        user_id=sick_walker.user_id,
+        new_user_id=walker.user_id,
+    )
+    assert response.status_code == 422
+    assert "Overlaps Customer 2024-01-08 0" in response.get_data(as_text=True)
+
+    db.session.expire_all()
+    walkers = get_walkers(monday, datetime.date(2024, 1, 22))
+    assert (datetime.date(2024, 1, 8), sick_walker.user_id) in walkers
+
+
+def test_reassign_rejects_overlaps_within_the_changed_bookings(form_client):
+    first_walker, second_walker = add_user("First"), add_user("Second")
+    walker = add_user("Walker")
+    add_bookings(1, monday, datetime.time(9), user=first_walker)
+    add_bookings(1, monday, datetime.time(9, 15), user=second_walker)
+
+    response = post_bulk(form_client, action="reassign", new_user_id=walker.user_id)
+    assert response.status_code == 422
+    assert "Overlaps" in response.get_data(as_text=True)
+
+
+def test_shift_rejects_double_booking(form_client):
+    walker = add_user("Walker")
+    add_bookings(1, monday, datetime.time(9), user=walker)
+    add_weekly_series(walker, date_start=datetime.date(2024, 1, 29))
+
+    response = post_bulk(
+        form_client,
+        action="shift",
+        user_id=walker.user_id,
+        date_max="2024-01-07",
+        days=28,
+    )
+    assert response.status_code == 422
+    assert "Overlaps Series customer Walker" in response.get_data(as_text=True)
+
+    response = post_bulk(
+        form_client,
+        action="shift",
+        user_id=walker.user_id,
+        date_max="2024-01-07",
+        days=29,
+    )
+    assert response.status_code == 200
+    assert "<b>1</b> bookings changed" in response.get_data(as_text=True)
+
+    db.session.expire_all()
+    walkers = get_walkers(monday, datetime.date(2024, 2, 6))
+    assert (datetime.date(2024, 1, 30), walker.user_id) in walkers
+    assert (monday, walker.user_id) not in walkers
+
+
+def test_shift_moves_series_occurrences(form_client):
+    walker = add_user("Walker")
+    add_weekly_series(walker)
+
+    response = post_bulk(form_client, action="shift", date_max="2024-01-14", days=2)
+    assert response.status_code == 200
+
+    db.session.expire_all()
+    assert get_walkers(monday, datetime.date(2024, 1, 23)) == [
+        (datetime.date(2024, 1, 3), walker.user_id),
+        (datetime.date(2024, 1, 10), walker.user_id),
+        (datetime.date(2024, 1, 15), walker.user_id),
+        (datetime.date(2024, 1, 22), walker.user_id),
+    ]
+
+
+def test_failed_bulk_change_leaves_series_untouched(form_client, monkeypatch):
+    from models import Booking
+    from services import booking_service
+
+    booking_series = add_weekly_series(add_user("Walker"))
+
+    def _fail(*args, **kwargs):
+        raise RuntimeError("audit failed")
+
+    monkeypatch.setattr(booking_service, "BookingAudit", _fail)
+    response = post_bulk(form_client, action="delete")
+    assert response.status_code == 200
+
+    db.session.expire_all()
+    assert db.session.query(Booking).count() == 0
+    assert booking_series.exceptions == []
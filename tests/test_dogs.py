@@ -0,0 +1,35 @@
+from app import db
+from conftest import add_customer, count_statements
+
+
+def add_dogs(n, name):
+    """Adds `n` dogs, each with its own customer and vet."""
+    from models import Dog, Vet
+
+    for i in range(n):
+        customer = add_customer(f"{name} owner {i}")
+        vet = Vet(name=f"{name} vet {i}", address="", phone="0")
+        db.session.add(vet)
+        db.session.flush()
+        db.session.add(
+            Dog(
+                name=f"{name} {i}",
+                is_allowed_treats=True,
+                is_allowed_off_the_lead=False,
+                is_allowed_on_social_media=True,
+                is_neutered_or_spayed=True,
+                customer_id=customer.customer_id,
+                vet_id=vet.vet_id,
+            )
+        )
+    db.session.commit()
+
+
+def test_dogs_page_query_count_is_constant(client):
+    add_dogs(3, "Rex")
+    few = count_statements(client, "/dogs/")
+
+    add_dogs(40, "Fido")
+    many = count_statements(client, "/dogs/")
+
+    assert many == few
@@ -0,0 +1,77 @@
+import datetime
+import time
+
+from app import db
+from conftest import add_customer, add_service, add_user, recorded_statements
+
+monday = datetime.date(2024, 1, 1)
+
+
+def add_busy_weeks(walkers, service, weeks=4, bookings_per_day=6):
+    """Books every walker for `bookings_per_day` walks on each day."""
+    from models import Booking
+
+    customer = add_customer("Regular")
+    db.session.execute(
+        Booking.__table__.insert(),
+        [
+            {
+                "date": monday + datetime.timedelta(days=day),
+                "time": datetime.time(8 + 2 * slot),
+                "customer_id": customer.customer_id,
+                "service_id": service.service_id,
+                "user_id": walker.user_id,
+            }
+            for walker in walkers
+            for day in range(weeks * 7)
+            for slot in range(bookings_per_day)
+        ],
+    )
+    db.session.commit()
+
+
+def get_slots(client, service, date_max):
+    return client.get(
+        "/bookings/slots",
+        query_string={
+            "service_id": service.service_id,
+            "user_id": -1,
+            "date_min": monday.isoformat(),
+            "date_max": date_max.isoformat(),
+        },
+    )
+
+
+def test_four_week_search_for_all_walkers_is_fast(client):
+    from services import booking_service
+
+    walkers = [add_user(f"Walker{i}") for i in range(10)]
+    service = add_service("Walk", duration=30)
+    add_busy_weeks(walkers, service)
+    date_max = monday + datetime.timedelta(weeks=4, days=-1)
+
+    booking_service.get_free_slots(service.service_id, monday, date_max)
+    start = time.perf_counter()
+    with recorded_statements() as statements:
+        free_slots = booking_service.get_free_slots(
+            service.service_id, monday, date_max
+        )
+    elapsed = time.perf_counter() - start
+
+    assert len(free_slots) == 11 * 28  # every active user, every day
+    assert len(statements) <= 3
+    assert elapsed < 0.1, f"4-week search took {elapsed * 1000:.0f} ms"
+
+
+def test_search_window_is_capped(client):
+    from services import booking_service
+
+    service = add_service("Walk", duration=30)
+    too_far = monday + datetime.timedelta(days=booking_service.max_free_slot_days)
+
+    last_day = too_far - datetime.timedelta(days=1)
+    reversed_day = monday - datetime.timedelta(days=1)
+
+    assert get_slots(client, service, last_day).status_code == 200
+    assert get_slots(client, service, too_far).status_code == 400
+    assert get_slots(client, service, reversed_day).status_code == 400
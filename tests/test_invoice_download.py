@@ -0,0 +1,52 @@
+import datetime
+from decimal import Decimal
+import gc
+import os
+import tracemalloc
+
+# Fixed budget for rendering a 5,000-line (239-page) invoice. The canvas
+# keeps every finished page until save(), so this is not flat in the page
+# count, but a regression to building all lines at once blows through it.
+max_render_memory = 6 * 1024 * 1024
+
+
+def get_invoice_data(number_of_lines: int) -> dict:
+    date = datetime.date(2024, 1, 1)
+    return {
+        "reference": "2024-01-1",
+        "date_issued": datetime.date(2024, 1, 31),
+        "date_due": datetime.date(2024, 2, 7),
+        "price_subtotal": Decimal("12.50") * number_of_lines,
+        "price_discount": Decimal("0.00"),
+        "price_total": Decimal("12.50") * number_of_lines,
+        "customer_name": "Customer",
+        "lines": [
+            (date, datetime.time(9), "Walk", Decimal("12.50"))
+            for _ in range(number_of_lines)
+        ],
+    }
+
+
+def get_peak_memory(invoice_data: dict) -> int:
+    from services import invoice_download_service
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        invoice_download_service.render(invoice_data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+def test_render_memory_stays_within_budget(app_context, monkeypatch):
+    from services import invoice_download_service
+
+    # The logo path is relative to the repository root.
+    monkeypatch.chdir(os.path.join(os.path.dirname(__file__), ".."))
+    invoice_download_service.render(get_invoice_data(1))
+
+    peak = get_peak_memory(get_invoice_data(5000))
+
+    assert peak < max_render_memory, f"Peak was {peak / 1024 / 1024:.1f} MB"
@@ -0,0 +1,76 @@
+import datetime
+import os
+
+import pytest
+
+from app import db
+from conftest import add_bookings
+
+
+@pytest.fixture
+def render_client(app, client, monkeypatch):
+    # As on a serverless host, where no background thread picks jobs up.
+    monkeypatch.setitem(app.config, "INVOICE_RENDER_IN_BACKGROUND", False)
+    monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+    # The logo path is relative to the repository root.
+    monkeypatch.chdir(os.path.join(os.path.dirname(__file__), ".."))
+    return client
+
+
+def add_invoice(admin) -> int:
+    from services import invoice_service
+
+    add_bookings(1, datetime.date(2024, 1, 1))
+    (result,) = invoice_service.generate_invoices(
+        datetime.date(2024, 1, 1), datetime.date(2024, 2, 1), admin.user_id
+    )
+    return result["invoice_id"]
+
+
+def get_render_job(invoice_render_job_id):
+    from models import InvoiceRenderJob
+
+    return db.session.get(
+        InvoiceRenderJob, invoice_render_job_id, populate_existing=True
+    )
+
+
+def poll(client, invoice_render_job_id):
+    response = client.get(f"/invoices/render/{invoice_render_job_id}")
+    assert response.status_code == 200
+    return response.get_data(as_text=True)
+
+
+def test_status_poll_renders_a_queued_job(render_client, admin):
+    from models import InvoiceRenderJob
+    from services import invoice_cache_service
+
+    invoice_id = add_invoice(admin)
+    response = render_client.post(f"/invoices/{invoice_id}/render")
+    assert "Preparing" in response.get_data(as_text=True)
+    (invoice_render_job,) = db.session.query(InvoiceRenderJob).all()
+    assert invoice_render_job.status == "pending"
+
+    invoice_render_job_id = invoice_render_job.invoice_render_job_id
+    assert "Preparing" not in poll(render_client, invoice_render_job_id)
+    invoice_render_job = get_render_job(invoice_render_job_id)
+    assert invoice_render_job.status == "done"
+    assert invoice_cache_service.get_invoice_pdf(invoice_render_job.content_hash)
+
+
+def test_status_poll_takes_over_a_stale_job(render_client, admin):
+    from models import InvoiceRenderJob
+
+    invoice_id = add_invoice(admin)
+    # Claimed by a worker that was frozen or stopped before it finished.
+    invoice_render_job = InvoiceRenderJob(
+        invoice_id=invoice_id,
+        status="running",
+        updated_at=datetime.datetime.utcnow() - datetime.timedelta(minutes=2),
+    )
+    db.session.add(invoice_render_job)
+    db.session.commit()
+    invoice_render_job_id = invoice_render_job.invoice_render_job_id
+
+    poll(render_client, invoice_render_job_id)
+    assert get_render_job(invoice_render_job_id).status == "done"
@@ -0,0 +1,170 @@
+import datetime
+import io
+import zipfile
+
+import pytest
+
+from app import db
+from conftest import (
+    add_customer,
+    add_service,
+    add_user,
+    count_statements,
+    log_in,
+    recorded_statements,
+)
+
+
+@pytest.fixture
+def walker_client(app, app_context, monkeypatch):
+    monkeypatch.setitem(app.config, "WTF_CSRF_ENABLED", False)
+    client = app.test_client()
+    log_in(client, add_user("Walker"))
+    return client
+
+
+def test_unbilled_report_needs_an_admin(walker_client):
+    response = walker_client.get("/invoices/unbilled")
+    assert b"does not have permissions" in response.data
+    assert response.mimetype == "text/html"
+
+
+@pytest.mark.parametrize("method", ["GET", "POST"])
+def test_batch_invoicing_needs_an_admin(walker_client, method):
+    from models import Invoice
+
+    response = walker_client.open("/invoices/batch", method=method)
+    assert b"does not have permissions" in response.data
+    assert Invoice.query.count() == 0
+
+
+def test_batch_invoicing_form_is_shown_to_admins(client):
+    response = client.get("/invoices/batch")
+    assert response.status_code == 200
+    assert b"does not have permissions" not in response.data
+
+
+def test_export_needs_an_admin(walker_client):
+    response = walker_client.get("/invoices/export.zip?from=2024-01-01&to=2024-12-31")
+    assert b"does not have permissions" in response.data
+    assert response.mimetype == "text/html"
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["", "?from=2024-01-01", "?from=2024-13-01&to=2024-12-31", "?from=x&to=y"],
+)
+def test_export_rejects_bad_dates(client, query):
+    response = client.get(f"/invoices/export.zip{query}")
+    assert response.status_code == 400
+
+
+def test_export_streams_a_zip(client):
+    response = client.get("/invoices/export.zip?from=2024-01-01&to=2024-12-31")
+    assert response.status_code == 200
+    assert zipfile.ZipFile(io.BytesIO(response.data)).namelist() == []
+
+
+def test_unbilled_series_expand_after_their_last_invoice(admin, monkeypatch):
+    from models import BookingSeries
+    from services import booking_series_service, invoice_service
+
+    customer = add_customer("Regular")
+    service = add_service("Walk")
+    booking_series = BookingSeries(
+        date_start=datetime.date(2020, 1, 6),
+        time=datetime.time(9),
+        weekdays="0",
+        customer_id=customer.customer_id,
+        service_id=service.service_id,
+    )
+    db.session.add(booking_series)
+    db.session.commit()
+    invoice_service.generate_invoices(
+        datetime.date(2020, 1, 1), datetime.date(2024, 1, 1), admin.user_id
+    )
+
+    expanded_dates = []
+    get_occurrence_dates = booking_series_service.get_occurrence_dates
+
+    def _get_occurrence_dates(*args):
+        for date in get_occurrence_dates(*args):
+            expanded_dates.append(date)
+            yield date
+
+    monkeypatch.setattr(
+        booking_series_service, "get_occurrence_dates", _get_occurrence_dates
+    )
+    (group,) = invoice_service.get_unbilled_bookings(datetime.date(2024, 2, 1))
+
+    mondays = [datetime.date(2024, 1, day) for day in (1, 8, 15, 22, 29)]
+    assert [booking.date for booking in group["bookings"]] == mondays
+    assert group["price_subtotal"] == 5 * service.price
+    assert expanded_dates == mondays
+
+
+def test_batch_lines_are_selected_by_invoice(admin):
+    from models import Booking, InvoiceLine
+    from services import invoice_service
+
+    service = add_service("Walk")
+    customers = [add_customer("Daily"), add_customer("Weekly")]
+    bookings = [
+        Booking(
+            date=datetime.date(2024, 1, 1) + datetime.timedelta(days=day),
+            time=datetime.time(9),
+            customer_id=customer.customer_id,
+            service_id=service.service_id,
+        )
+        for customer in customers
+        for day in range(100)
+    ]
+    db.session.add_all(bookings)
+    db.session.commit()
+    booking_ids = {booking.booking_id for booking in bookings}
+
+    with recorded_statements() as statements:
+        results = invoice_service.generate_invoices(
+            datetime.date(2024, 1, 1), datetime.date(2025, 1, 1), admin.user_id
+        )
+
+    assert len(results) == 2
+    (lines_statement,) = [
+        statement
+        for statement in statements
+        if statement.startswith("INSERT INTO invoice_line")
+    ]
+    # Bound by the invoices made, not the bookings invoiced.
+    assert lines_statement.count("?") <= len(results)
+    assert {line.booking_id for line in InvoiceLine.query} == booking_ids
+
+
+def add_invoices(n, name):
+    """Adds `n` invoices, each for its own customer."""
+    from models import Invoice
+
+    for i in range(n):
+        customer = add_customer(f"{name} {i}")
+        db.session.add(
+            Invoice(
+                date_start=datetime.date(2024, 1, 1),
+                date_end=datetime.date(2024, 2, 1),
+                date_issued=datetime.date(2024, 2, 1),
+                price_subtotal=20,
+                price_discount=0,
+                price_total=20,
+                customer_id=customer.customer_id,
+                reference=f"{name}-{i}",
+            )
+        )
+    db.session.commit()
+
+
+def test_invoices_page_query_count_is_constant(client):
+    add_invoices(3, "Early")
+    few = count_statements(client, "/invoices/")
+
+    add_invoices(40, "Late")
+    many = count_statements(client, "/invoices/")
+
+    assert many == few
@@ -0,0 +1,108 @@
+import datetime
+
+from app import db
+from conftest import (
+    add_bookings,
+    add_customer,
+    add_service,
+    add_user,
+    recorded_statements,
+)
+
+
+def get_workload_rows() -> dict:
+    from models import UserWorkload
+
+    return {
+        (workload.user_id, workload.week_start): (
+            workload.user_workload_id,
+            workload.booking_count,
+            workload.minutes,
+        )
+        for workload in db.session.query(UserWorkload).populate_existing()
+    }
+
+
+def test_workload_rows_are_updated_in_place(app_context):
+    walker = add_user("Walker")
+    monday = datetime.date(2024, 1, 1)
+    first_booking, second_booking = add_bookings(2, monday, user=walker)
+    rows = get_workload_rows()
+    user_workload_id, booking_count, minutes = rows[(walker.user_id, monday)]
+    assert (booking_count, minutes) == (2, 120.0)
+
+    second_booking.time = datetime.time(14)
+    db.session.delete(first_booking)
+    db.session.commit()
+    assert get_workload_rows() == {
+        (walker.user_id, monday): (user_workload_id, 1, 60.0),
+    }
+
+    # A week left without bookings loses its row.
+    second_booking.date = datetime.date(2024, 1, 10)
+    db.session.commit()
+    assert list(get_workload_rows()) == [(walker.user_id, datetime.date(2024, 1, 8))]
+
+
+def test_refresh_overwrites_a_row_committed_concurrently(app_context):
+    from models import UserWorkload
+    from services import workload_service
+
+    walker = add_user("Walker")
+    monday = datetime.date(2024, 1, 1)
+    add_bookings(1, monday, user=walker)
+    # As if another transaction wrote the same walker-week meanwhile.
+    db.session.query(UserWorkload).update({"booking_count": 5, "minutes": 300.0})
+    db.session.commit()
+
+    workload_service.refresh_workload(db.session, monday, monday)
+    db.session.commit()
+    (row,) = get_workload_rows().values()
+    assert row[1:] == (1, 60.0)
+
+
+def test_flush_refreshes_all_touched_weeks_at_once(app_context):
+    from models import Booking
+
+    walkers = [add_user("Walker"), add_user("Other")]
+    customer = add_customer("Regular")
+    service = add_service("Walk", duration=30)
+    bookings = [
+        Booking(
+            date=datetime.date(2024, 1, 1) + datetime.timedelta(weeks=week),
+            time=datetime.time(9),
+            customer_id=customer.customer_id,
+            service_id=service.service_id,
+            user_id=walker.user_id,
+        )
+        for walker in walkers
+        for week in range(15)
+    ]
+    with recorded_statements() as statements:
+        db.session.add_all(bookings)
+        db.session.commit()
+
+    workload_statements = [
+        statement
+        for statement in statements
+        if "user_workload" in statement or "GROUP BY booking.user_id" in statement
+    ]
+    assert len(workload_statements) <= 2  # one aggregate, one upsert
+    rows = get_workload_rows()
+    assert len(rows) == 30
+    assert {row[1:] for row in rows.values()} == {(1, 30.0)}
+
+
+def test_service_duration_change_refreshes_its_weeks(app_context):
+    walker = add_user("Walker")
+    monday = datetime.date(2024, 1, 1)
+    (booking,) = add_bookings(1, monday, user=walker)
+    next_monday = monday + datetime.timedelta(weeks=1)
+    add_bookings(1, next_monday, user=walker)
+    assert {row[1:] for row in get_workload_rows().values()} == {(1, 60.0)}
+
+    booking.service.duration = 45
+    db.session.commit()
+    rows = get_workload_rows()
+    assert rows[(walker.user_id, monday)][1:] == (1, 45.0)
+    assert rows[(walker.user_id, next_monday)][1:] == (1, 60.0)